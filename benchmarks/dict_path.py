@@ -0,0 +1,73 @@
+import argparse
+from pathlib import Path
+import time
+
+import glom
+from scrapy.utils.project import get_project_settings
+
+from ornacodex.scripts import codex
+from ornacodex.utils.converter import UniqueKeyGenerator
+from ornacodex.utils.dict_path import DictPath
+from ornacodex.utils.path_config import TmpPathConfig
+
+
+_missing = object()
+
+
+class GlomPath:
+    # the glom calls scan() made before DictPath
+
+    @classmethod
+    def get(cls, target, path, default=_missing):
+        if isinstance(path, tuple):
+            path = glom.Path(*path)
+        if default is _missing:
+            return glom.glom(target, path)
+        return glom.glom(target, glom.Coalesce(path, default=default))
+
+    @classmethod
+    def assign(cls, target, path, value):
+        return glom.assign(target, path, value)
+
+
+def run_scan(settings, input_dir: TmpPathConfig, path_impl) -> tuple[float, dict]:
+    # key generators are module state, start every run from scratch
+    codex.icon_key_generator = UniqueKeyGenerator()
+    codex.abilities_key_generator = UniqueKeyGenerator()
+    codex.DictPath = path_impl
+    try:
+        start = time.perf_counter()
+        scanned = codex.scan(settings, input_dir)
+        return time.perf_counter() - start, scanned
+    finally:
+        codex.DictPath = DictPath
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='codex scan() with DictPath against glom')
+    parser.add_argument('--input', default='tmp', help='tmp dir of a download')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    settings = get_project_settings()
+    input_dir = TmpPathConfig(Path(args.input))
+
+    results = {}
+    for name, path_impl in (('glom', GlomPath), ('dict_path', DictPath)):
+        timings = []
+        for _ in range(args.repeat):
+            elapsed, scanned = run_scan(settings, input_dir, path_impl)
+            timings.append(elapsed)
+        results[name] = (min(timings), scanned)
+        print(f'{name:>10}: {min(timings):.3f}s (best of {args.repeat})')
+
+    if results['glom'][1] != results['dict_path'][1]:
+        print('scan() results differ')
+        exit(1)
+    print('scan() results match, speedup: '
+          f'{results["glom"][0] / results["dict_path"][0]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+import argparse
+from pathlib import Path
+import time
+
+from scrapy.http import HtmlResponse
+
+from ornacodex.utils.exctractor import Exctractor
+
+
+# a boss / raid page, `{abilities}` and `{drops}` are repeated to size it
+page_template = '''<!DOCTYPE html>
+<html>
+<body>
+<div class="codex-page">
+  <div class="codex-page-icon"><img src="/static/img/bosses/dragon.png" class="aura-superboss"></div>
+  <h1>Dragon</h1>
+  <div class="codex-page-meta">Tier: ★9</div>
+  <hr>
+  <h4>Abilities:</h4>
+  {abilities}
+  <hr>
+  <h4>Skills:</h4>
+  <div class="drop"><a href="/codex/spells/fireball/"><img src="/static/img/spells/fireball.png"><span>Fireball</span></a></div>
+  <hr>
+  <h4>Drops:</h4>
+  {drops}
+  <hr>
+  <h4>Causes:</h4>
+  <div class="drop"><img src="/static/img/statuses/burning.png"><span>Burning (25%)</span><div class="emph">Deals damage over time.</div></div>
+</div>
+</body>
+</html>'''
+ability = ('<div class="spaced"><img src="/static/img/skills/flame{i}.png"><span>Flame Breath {i}</span>'
+           '<div class="emph">Breathes fire.</div><div class="codex-stats">'
+           '<div class="codex-stat">Power: 4.0</div>'
+           '<div class="codex-stat">Gives: Burning (20%), Rot (5%)</div>'
+           '<div class="codex-stat">Cooldown: 3 turns / Cost: 10 mana</div></div></div>')
+drop = ('<div class="drop"><a href="/codex/items/item-{i}/"><img src="/static/img/items/item-{i}.png">'
+        '<span>Item {i}</span></a></div>')
+
+
+def extract_drops_per_sibling(response):
+    # the loop every spider ran before Exctractor.extract_drops
+    drops = response.xpath("//div[@class='codex-page'][1]/h4")
+    tmp = []
+    for h4 in drops:
+        drop_name = Exctractor.extract_kv(
+            h4.xpath('string()').get())[0].strip()
+        d = h4.xpath("./following-sibling::*[1]")
+        d_list = []
+        while any(d):
+            if any(d.xpath('self::hr | self::h4')):
+                break
+            d_list.append(Exctractor.extract_drop(d[0].root))
+            d = d.xpath("./following-sibling::*[1]")
+        tmp.append((drop_name, d_list))
+    return tmp
+
+
+def make_response(body: str | bytes, url: str = 'https://playorna.com/codex/bosses/dragon/'):
+    return HtmlResponse(url=url, body=body, encoding='utf-8')
+
+
+def best_of(repeat: int, func, response) -> tuple[float, list]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(response)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='drop sections: Exctractor.extract_drops against the per sibling loop')
+    parser.add_argument('pages', nargs='*', help='codex pages (html) to extract as well')
+    parser.add_argument('--sizes', default='10,100,400',
+                        help='abilities and drops of the generated pages')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    responses = {}
+    for size in map(int, args.sizes.split(',')):
+        responses[f'generated x{size}'] = make_response(page_template.format(
+            abilities='\n  '.join(ability.format(i=i) for i in range(size)),
+            drops='\n  '.join(drop.format(i=i) for i in range(size)),
+        ))
+    for page in map(Path, args.pages):
+        responses[str(page)] = make_response(page.read_bytes())
+
+    for name, response in responses.items():
+        old, old_drops = best_of(args.repeat, extract_drops_per_sibling, response)
+        new, new_drops = best_of(args.repeat, lambda r: Exctractor.extract_drops(r.selector.root), response)
+        if old_drops != new_drops:
+            print(f'{name}: drops differ')
+            exit(1)
+        print(f'{name:>20}: per sibling {old * 1000:8.2f}ms, '
+              f'extract_drops {new * 1000:8.2f}ms ({old / new:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
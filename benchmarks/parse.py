@@ -0,0 +1,296 @@
+import argparse
+import ast
+from collections import defaultdict
+from datetime import datetime
+import importlib
+import inspect
+import json
+from pathlib import Path
+import platform
+import subprocess
+import sys
+import textwrap
+import time
+
+from scrapy.http import HtmlResponse
+
+from ornacodex.utils.exctractor import Exctractor
+
+
+fixtures_dir = Path(__file__).parent.joinpath('fixtures')
+results_dir = Path(__file__).parent.joinpath('results')
+# where and when `benchmarks.record` took the pages from, and their urls
+source_file = 'source.json'
+
+
+def load_source(fixtures: Path) -> dict | None:
+    # source.json of a recorded corpus
+    source = fixtures.joinpath(source_file)
+    if not source.exists():
+        return None
+    with open(source) as f:
+        return json.load(f)
+
+
+def load_fixtures(fixtures: Path, categories: list[str] | None = None) -> dict:
+    # category -> [(spider, url, encoding, body)], pages at
+    # <language>/<category>/<id>.html and the category listing at
+    # <language>/<category>.html, as recorded in source.json
+    source = load_source(fixtures)
+    if source is None:
+        return {}
+    recorded = source['pages']
+    pages = defaultdict(list)
+    spiders = {}
+    for page in sorted(fixtures.glob('*/*/*.html')):
+        language, category, _ = page.relative_to(fixtures).parts
+        path = page.relative_to(fixtures).as_posix()
+        if categories and category not in categories or path not in recorded:
+            continue
+        if (language, category) not in spiders:
+            spider = importlib.import_module(f'ornacodex.spiders.{category}').Spider(language=language)
+            category_page = recorded.get(f'{language}/{category}.html')
+            if category_page is not None:
+                spider.parse_category(HtmlResponse(
+                    url=category_page['url'], encoding=category_page['encoding'],
+                    body=fixtures.joinpath(language, f'{category}.html').read_bytes()))
+            else:
+                spider.category_text = category.title()
+            spiders[(language, category)] = spider
+        pages[category].append((spiders[(language, category)], recorded[path]['url'],
+                                recorded[path]['encoding'], page.read_bytes()))
+    return pages
+
+
+def parse(spider, url: str, encoding: str, body: bytes) -> list:
+    return list(spider.parse_item(HtmlResponse(url=url, body=body, encoding=encoding)))
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def field_lines(func) -> dict[int, str]:
+    # line -> field of a parse_item: the statements up to a `struct[...] =`
+    # compute that field, what follows the last one builds the item and
+    # `CodexPage(response)` parses the document
+    lines, first = inspect.getsourcelines(func)
+    body = ast.parse(textwrap.dedent(''.join(lines))).body[0].body
+    spans = {}
+    pending = []
+    for stmt in body:
+        if (isinstance(stmt, ast.Assign) and isinstance(stmt.value, ast.Call)
+                and getattr(stmt.value.func, 'id', None) == 'CodexPage'):
+            # parsing the document itself
+            for line in range(stmt.lineno, stmt.end_lineno + 1):
+                spans[line + first - 1] = '(document)'
+            continue
+        pending.append(stmt)
+        fields = [
+            node.targets[0].slice.value for node in ast.walk(stmt)
+            if isinstance(node, ast.Assign)
+            and isinstance(node.targets[0], ast.Subscript)
+            and isinstance(node.targets[0].value, ast.Name)
+            and node.targets[0].value.id == 'struct'
+            and isinstance(node.targets[0].slice, ast.Constant)
+        ]
+        if any(fields):
+            for s in pending:
+                for line in range(s.lineno, s.end_lineno + 1):
+                    spans[line + first - 1] = fields[0]
+            pending = []
+    for s in pending:
+        for line in range(s.lineno, s.end_lineno + 1):
+            spans[line + first - 1] = '(item)'
+    return spans
+
+
+def trace_fields(spider_pages: list, rounds: int) -> dict[str, float]:
+    # share of parse_item time spent on each field, from a line trace of
+    # the callback (calls it makes are timed with the line making them)
+    func = type(spider_pages[0][0]).parse_item
+    code = func.__code__
+    lines = field_lines(func)
+    spent = defaultdict(float)
+    last = {}
+
+    def local_trace(frame, event, arg):
+        now = time.perf_counter()
+        if 'line' in last:
+            spent[lines.get(last['line'], '(item)')] += now - last['time']
+        if event in ('line', 'call'):
+            last['line'] = frame.f_lineno
+        else:
+            last.pop('line', None)
+        last['time'] = time.perf_counter()
+        return local_trace
+
+    def global_trace(frame, event, arg):
+        if frame.f_code is code:
+            last.pop('line', None)
+            last['time'] = time.perf_counter()
+            return local_trace
+        return None
+
+    sys.settrace(global_trace)
+    try:
+        for _ in range(rounds):
+            for spider, url, encoding, body in spider_pages:
+                parse(spider, url, encoding, body)
+    finally:
+        sys.settrace(None)
+    total = sum(spent.values()) or 1
+    return {field: t / total for field, t in spent.items()}
+
+
+def record_exctractor(pages: dict) -> dict[str, list]:
+    # the arguments every Exctractor method gets while the fixtures are parsed
+    methods = {
+        name: getattr(Exctractor, name) for name, value in vars(Exctractor).items()
+        if isinstance(value, classmethod)
+    }
+    calls = {name: [] for name in methods}
+
+    def recorder(name, method):
+        def record(cls, *args, **kwargs):
+            calls[name].append((args, kwargs))
+            return method(*args, **kwargs)
+        return classmethod(record)
+
+    for name, method in methods.items():
+        setattr(Exctractor, name, recorder(name, method))
+    try:
+        for spider_pages in pages.values():
+            for spider, url, encoding, body in spider_pages:
+                parse(spider, url, encoding, body)
+    finally:
+        for name, method in methods.items():
+            setattr(Exctractor, name, classmethod(method.__func__))
+    return calls
+
+
+def bench_spiders(pages: dict, repeat: int, rounds: int) -> dict:
+    results = {}
+    for category, spider_pages in pages.items():
+        def run():
+            for _ in range(rounds):
+                for spider, url, encoding, body in spider_pages:
+                    parse(spider, url, encoding, body)
+        ms_page = best_of(repeat, run) / (rounds * len(spider_pages)) * 1000
+        shares = trace_fields(spider_pages, 1)
+        results[category] = {
+            'pages': len(spider_pages),
+            'ms_per_page': ms_page,
+            'pages_per_second': 1000 / ms_page,
+            'fields_ms_per_page': {
+                field: share * ms_page
+                for field, share in sorted(shares.items(), key=lambda x: -x[1])
+            },
+        }
+    return results
+
+
+def bench_exctractor(pages: dict, repeat: int, rounds: int) -> dict:
+    results = {}
+    for name, calls in sorted(record_exctractor(pages).items()):
+        method = getattr(Exctractor, name)
+        if not any(calls):
+            results[name] = {'calls': 0}
+            continue
+
+        def run():
+            for _ in range(rounds):
+                for args, kwargs in calls:
+                    method(*args, **kwargs)
+        us_call = best_of(repeat, run) / (rounds * len(calls)) * 1e6
+        results[name] = {
+            'calls': len(calls),
+            'us_per_call': us_call,
+            'calls_per_second': 1e6 / us_call,
+        }
+    return results
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, previous: dict):
+    print(f'\nagainst {previous.get("revision")} ({previous.get("date")}):')
+    if previous.get('fixtures') != results['fixtures']:
+        print(f'on other pages: {previous.get("fixtures")} -> {results["fixtures"]}')
+    for category, result in results['spiders'].items():
+        old = previous.get('spiders', {}).get(category)
+        if old is not None:
+            print(f'{category:>10}: {old["ms_per_page"]:8.3f} -> {result["ms_per_page"]:8.3f} ms/page '
+                  f'({old["ms_per_page"] / result["ms_per_page"]:.2f}x)')
+    for name, result in results['exctractor'].items():
+        old = previous.get('exctractor', {}).get(name, {})
+        if 'us_per_call' in result and 'us_per_call' in old:
+            print(f'{name:>20}: {old["us_per_call"]:8.2f} -> {result["us_per_call"]:8.2f} us/call '
+                  f'({old["us_per_call"] / result["us_per_call"]:.2f}x)')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='parse_item of every spider and the Exctractor methods over the fixture corpus')
+    parser.add_argument('--fixtures', type=Path, default=fixtures_dir,
+                        help='pages recorded by benchmarks.record')
+    parser.add_argument('--categories', help='only these spiders, comma separated')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--rounds', type=int, default=20, help='passes over the pages per timing')
+    parser.add_argument('--output', type=Path, help='results json (default: results/parse-<date>.json)')
+    parser.add_argument('--compare', type=Path, help='results json of an earlier run')
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures, args.categories.split(',') if args.categories else None)
+    if not any(pages):
+        print(f'No recorded pages in {args.fixtures}: '
+              f'python -m benchmarks.record --archive <RESPONSE_ARCHIVE of a download>')
+        exit(1)
+    source = load_source(args.fixtures)
+
+    date = datetime.now()
+    results = {
+        'date': date.isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        # the timings only compare between runs on the same pages
+        'fixtures': {'source': source['source'], 'captured': source['captured']},
+        'spiders': bench_spiders(pages, args.repeat, args.rounds),
+        'exctractor': bench_exctractor(pages, args.repeat, args.rounds),
+    }
+
+    for category, result in results['spiders'].items():
+        print(f'{category:>10}: {result["pages"]:3} pages, {result["ms_per_page"]:8.3f} ms/page, '
+              f'{result["pages_per_second"]:8.0f} pages/s')
+        for field, ms in result['fields_ms_per_page'].items():
+            print(f'{"":>12}{field:<16} {ms:8.3f} ms')
+    for name, result in results['exctractor'].items():
+        if result['calls'] == 0:
+            print(f'{name:>20}: not called by parse_item')
+        else:
+            print(f'{name:>20}: {result["calls"]:5} calls, {result["us_per_call"]:8.2f} us/call')
+
+    output = args.output or results_dir.joinpath(f'parse-{date:%Y%m%d-%H%M%S}.json')
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=4)
+    print(f'\nsaved to {output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import argparse
+from datetime import datetime
+import json
+from pathlib import Path
+from urllib.parse import urlparse
+
+from ornacodex.utils.archive import ResponseArchive
+
+from .parse import fixtures_dir, source_file
+
+
+def entry_id(url: str) -> str:
+    # /codex/<category>/<id>/
+    return urlparse(url).path.strip('/').split('/')[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='record the fixture corpus from the response archive of a download')
+    parser.add_argument('--archive', type=Path, default=Path('state/responses.sqlite'),
+                        help='RESPONSE_ARCHIVE of the download')
+    parser.add_argument('--fixtures', type=Path, default=fixtures_dir)
+    parser.add_argument('--categories', help='only these categories, comma separated')
+    parser.add_argument('--ids', help='entries to record as category/id, comma separated '
+                                      '(default: the first --per-category ids of each category)')
+    parser.add_argument('--per-category', type=int, default=5)
+    args = parser.parse_args()
+
+    if not args.archive.exists():
+        print(f'No response archive: {args.archive}')
+        exit(1)
+    archive = ResponseArchive.open(args.archive)
+    categories = args.categories.split(',') if args.categories else None
+    wanted = set(args.ids.split(',')) if args.ids else None
+
+    pages = {}
+    # the same ids in every language, picked in the first one archived
+    picked = {}
+    for language, category in archive.groups():
+        if categories and category not in categories:
+            continue
+        entries = {entry_id(url): (url, encoding, body)
+                   for url, encoding, body in archive.iter(language, category, 'entry')}
+        if category not in picked:
+            ids = sorted(entries)
+            if wanted is not None:
+                ids = [id for id in ids if f'{category}/{id}' in wanted]
+            picked[category] = ids[:args.per_category]
+        recorded = [(id, entries[id]) for id in picked[category] if id in entries]
+        if not any(recorded):
+            continue
+        category_page = next(archive.iter(language, category, 'category'), None)
+        if category_page is not None:
+            recorded.append((None, category_page))
+        for id, (url, encoding, body) in recorded:
+            # the category listing is kept next to its entries, out of the page glob
+            page = Path(language, category, f'{id}.html') if id else Path(language, f'{category}.html')
+            pages[page] = (url, encoding, body)
+    archive.close()
+
+    if not any(pages):
+        print(f'No pages to record in {args.archive}')
+        exit(1)
+
+    # the corpus is replaced as a whole, so pages of different sources don't mix
+    for page in [*args.fixtures.glob('*/*/*.html'), *args.fixtures.glob('*/*.html')]:
+        page.unlink()
+    for page, (url, encoding, body) in pages.items():
+        args.fixtures.joinpath(page).parent.mkdir(parents=True, exist_ok=True)
+        args.fixtures.joinpath(page).write_bytes(body)
+    source = {
+        'source': args.archive.as_posix(),
+        # the archive is written by the download, its pages are at most that old
+        'captured': datetime.fromtimestamp(args.archive.stat().st_mtime).isoformat(timespec='seconds'),
+        'recorded': datetime.now().isoformat(timespec='seconds'),
+        'pages': {page.as_posix(): {'url': url, 'encoding': encoding}
+                  for page, (url, encoding, _) in sorted(pages.items())},
+    }
+    with open(args.fixtures.joinpath(source_file), 'w') as f:
+        json.dump(source, f, ensure_ascii=False, indent=4)
+    print(f'Recorded {len(pages)} pages to {args.fixtures}')
+
+
+if __name__ == '__main__':
+    main()
@@ -22,6 +22,30 @@ def main():
     parser.add_argument('--disallow-patches', action='store_true',
                         help='disallow apply unindexed urls patches')
     parser.add_argument('--base', help='Set BASE_URL')
+    parser.add_argument('--concurrent', action='store_true',
+                        help='run all crawls of a phase concurrently')
+    parser.add_argument('--reuse-ids', action='store_true',
+                        help='list categories in the base language only')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only re-parse entries changed since the last run')
+    parser.add_argument('--jsonlines', action='store_true',
+                        help='write tmp feeds as json lines')
+    parser.add_argument('--workers', type=int,
+                        help='codex, reparse: parse in this many worker processes')
+    parser.add_argument('--check', action='store_true',
+                        help='reparse: check the entries against those of --input')
+    parser.add_argument('--sharded', action='store_true',
+                        help='codex: write codex and locales per category')
+    parser.add_argument('--compact', action='store_true',
+                        help='codex: also write the compact codex (string table, numbered entries)')
+    parser.add_argument('--search', action='store_true',
+                        help='codex: also write a search index per locale')
+    parser.add_argument('--previous',
+                        help='codex: output dir of the previous build, write delta patches from it')
+    parser.add_argument('--no-precompress', action='store_true',
+                        help='codex, export_extra: skip the .gz / .br copies of the json files')
+    parser.add_argument('--key-registry',
+                        help='codex: keep generated keys stable across runs in this file')
 
     args = parser.parse_args()
     command = args.command
@@ -55,11 +79,35 @@ def main():
         settings.set('HTTPCACHE_ENABLED', True)
         settings.set('HTTPCACHE_DIR',  'httpcache')
         settings.set('HTTPCACHE_STORAGE',
-                     'scrapy.extensions.httpcache.FilesystemCacheStorage')
+                     'ornacodex.utils.httpcache.SqliteCacheStorage')
     if args.disallow_patches:
         settings.set('PATCHES_ENABLED', False)
     if args.base:
         settings.set('BASE_URL', args.base)
+    if args.concurrent:
+        settings.set('CONCURRENT_CRAWL', True)
+    if args.reuse_ids:
+        settings.set('REUSE_BASE_IDS', True)
+    if args.incremental:
+        settings.set('INCREMENTAL_ENABLED', True)
+    if args.jsonlines:
+        settings.set('TMP_FEED_FORMAT', 'jsonlines')
+    if args.workers:
+        settings.set('CODEX_WORKERS', args.workers)
+    if args.check:
+        settings.set('REPARSE_CHECK', True)
+    if args.sharded:
+        settings.set('CODEX_SHARDED', True)
+    if args.compact:
+        settings.set('CODEX_COMPACT', True)
+    if args.search:
+        settings.set('CODEX_SEARCH', True)
+    if args.previous:
+        settings.set('CODEX_PREVIOUS', args.previous)
+    if args.no_precompress:
+        settings.set('OUTPUT_PRECOMPRESS', False)
+    if args.key_registry:
+        settings.set('KEY_REGISTRY', args.key_registry)
     mod.run(settings, **input_struct)
 
 
@@ -8,8 +8,10 @@ import scrapy
 
 class Image(scrapy.Item):
     icon = scrapy.Field()
-    file_urls = scrapy.Field()
-    files = scrapy.Field()
+    status = scrapy.Field()
+    body = scrapy.Field()
+    etag = scrapy.Field()
+    last_modified = scrapy.Field()
 
 class Base(scrapy.Item):
     id = scrapy.Field()
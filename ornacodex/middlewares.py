@@ -3,11 +3,18 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import asyncio
+import hashlib
+
 from scrapy import signals
+from scrapy.exceptions import NotConfigured
 
 # useful for handling different item types with a single interface
 from itemadapter import is_item, ItemAdapter
 
+from .utils.archive import ResponseArchive
+from .utils.incremental import EntryStateStore
+
 
 class OrnacodexSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -101,3 +108,190 @@ class OrnacodexDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class GlobalConcurrencyMiddleware:
+    # Shares one request budget between every crawler of the process, so
+    # spiders scheduled together on a CrawlerRunner don't multiply the
+    # number of requests in flight.
+
+    semaphore: asyncio.Semaphore | None = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('CONCURRENT_CRAWL'):
+            raise NotConfigured
+        if cls.semaphore is None:
+            cls.semaphore = asyncio.Semaphore(
+                settings.getint('GLOBAL_CONCURRENT_REQUESTS')
+                or settings.getint('CONCURRENT_REQUESTS'))
+        return cls()
+
+    async def process_request(self, request, spider):
+        # requests answered by an earlier middleware (e.g. httpcache) never
+        # get here, so only release the slots we actually took
+        await self.semaphore.acquire()
+        request.meta['global_slot'] = True
+        return None
+
+    def process_response(self, request, response, spider):
+        self.release(request)
+        return response
+
+    def process_exception(self, request, exception, spider):
+        self.release(request)
+
+    def release(self, request):
+        if request.meta.pop('global_slot', False):
+            self.semaphore.release()
+
+
+class IncrementalDownloaderMiddleware:
+    # Revalidates codex entries against the state of the last run: sends
+    # conditional requests and marks the response `unchanged` on 304 or when
+    # the body hash did not change.
+
+    def __init__(self, store: EntryStateStore):
+        self.store = store
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('INCREMENTAL_ENABLED'):
+            raise NotConfigured
+        return cls(EntryStateStore.open(settings.get('INCREMENTAL_STATE')))
+
+    def process_request(self, request, spider):
+        if not request.meta.get('entry') or request.meta.get('no_validators'):
+            return None
+        state = self.store.get(request.url)
+        if state is not None and state['item'] is not None:
+            if state['etag']:
+                request.headers.setdefault('If-None-Match', state['etag'])
+            if state['last_modified']:
+                request.headers.setdefault('If-Modified-Since', state['last_modified'])
+        return None
+
+    def process_response(self, request, response, spider):
+        if not request.meta.get('entry') or response.status not in (200, 304):
+            return response
+        state = self.store.get(request.url)
+        if response.status == 304:
+            if state is None or state['item'] is None:
+                # nothing to reuse, ask again without validators
+                request.headers.pop('If-None-Match', None)
+                request.headers.pop('If-Modified-Since', None)
+                return request.replace(dont_filter=True)
+            request.meta['entry_state'] = {'status': 'unchanged'}
+            return response.replace(status=200)
+
+        body_hash = hashlib.md5(response.body).hexdigest()
+        if state is None or state['item'] is None:
+            status = 'added'
+        elif state['hash'] == body_hash:
+            status = 'unchanged'
+        else:
+            status = 'changed'
+        request.meta['entry_state'] = {
+            'status': status,
+            'etag': (response.headers.get('ETag') or b'').decode() or None,
+            'last_modified': (response.headers.get('Last-Modified') or b'').decode() or None,
+            'hash': body_hash,
+        }
+        return response
+
+
+class ResponseArchiveMiddleware:
+    # Keeps the raw category and entry responses of the crawl in
+    # `RESPONSE_ARCHIVE` for `reparse`. Sits before the incremental
+    # middleware so it still sees the 304 of unchanged entries, and after
+    # HttpCompressionMiddleware (590) so it keeps decompressed bodies.
+
+    def __init__(self, archive: ResponseArchive):
+        self.archive = archive
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get('RESPONSE_ARCHIVE')
+        if not path:
+            raise NotConfigured
+        return cls(ResponseArchive.open(path))
+
+    def process_response(self, request, response, spider):
+        if request.meta.get('entry'):
+            kind = 'entry'
+        elif request.meta.get('category'):
+            kind = 'category'
+        else:
+            return response
+        if response.status == 304:
+            if self.archive.has(request.url):
+                self.archive.touch(request.url)
+                return response
+            # no body to keep, ask again without validators
+            request.headers.pop('If-None-Match', None)
+            request.headers.pop('If-Modified-Since', None)
+            return request.replace(dont_filter=True, meta={**request.meta, 'no_validators': True})
+        if response.status == 200 and hasattr(response, 'encoding'):
+            self.archive.save(request.url, kind, spider.language, spider.name,
+                              response.url, response.encoding, response.body)
+        return response
+
+
+class IncrementalSpiderMiddleware:
+    # Emits the stored item of unchanged entries instead of parsing them
+    # again, and records the items of added or changed ones.
+
+    def __init__(self, store: EntryStateStore):
+        self.store = store
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('INCREMENTAL_ENABLED'):
+            raise NotConfigured
+        return cls(EntryStateStore.open(settings.get('INCREMENTAL_STATE')))
+
+    def process_spider_output(self, response, result, spider):
+        state = response.meta.get('entry_state')
+        if state is None:
+            yield from result
+            return
+        if state['status'] == 'unchanged':
+            yield self.reuse(response, spider)
+            return
+        for i in result:
+            self.record(response, spider, i)
+            yield i
+
+    async def process_spider_output_async(self, response, result, spider):
+        state = response.meta.get('entry_state')
+        if state is None:
+            async for i in result:
+                yield i
+            return
+        if state['status'] == 'unchanged':
+            yield self.reuse(response, spider)
+            return
+        async for i in result:
+            self.record(response, spider, i)
+            yield i
+
+    def reuse(self, response, spider):
+        url = response.request.url
+        state = response.meta['entry_state']
+        stored = self.store.get(url)
+        if 'hash' in state:
+            # same body under new validators, keep them for next time
+            self.store.save(url, spider.language, spider.name,
+                            stored['item']['id'], state, stored['item'])
+        else:
+            self.store.touch(url)
+        return stored['item']
+
+    def record(self, response, spider, i):
+        if is_item(i):
+            item = ItemAdapter(i).asdict()
+            self.store.save(response.request.url, spider.language, spider.name,
+                            item['id'], response.meta['entry_state'], item)
@@ -3,10 +3,7 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
-
-# useful for handling different item types with a single interface
-import scrapy
-from scrapy.pipelines.files import FilesPipeline
+from .utils.image_store import ImageStore
 
 
 class OrnacodexPipeline:
@@ -14,12 +11,23 @@ class OrnacodexPipeline:
         return item
 
 
-class IconFilesPipeline(FilesPipeline):
+class IconStorePipeline:
+    # keeps the downloaded icons in IMAGE_STORE, a 304 leaves the stored one
 
-    def get_media_requests(self, item, info):
-        for image in item['file_urls']:
-            yield scrapy.Request(image, meta={'icon': item['icon'].strip('/')})
+    def open_spider(self, spider):
+        self.store = ImageStore.open(spider.settings.get('IMAGE_STORE'))
+        self.counts = {'added': 0, 'changed': 0, 'unchanged': 0}
 
-    def file_path(self, request: scrapy.Request, response=None, info=None, *, item=None):
-        image_filepath = request.meta.get('icon')
-        return image_filepath
+    def process_item(self, item, spider):
+        if item['status'] == 304:
+            self.counts['unchanged'] += 1
+        else:
+            known = self.store.get(item['icon']) is not None
+            changed = self.store.save(item['icon'], item['body'], item['etag'], item['last_modified'])
+            self.counts['unchanged' if not changed else 'changed' if known else 'added'] += 1
+        # the body is in the store, keep it out of the logs
+        return {'icon': item['icon'], 'status': item['status']}
+
+    def close_spider(self, spider):
+        self.store.flush(force=True)
+        spider.logger.info('Icons: ' + ', '.join(f'{n} {status}' for status, n in self.counts.items()))
@@ -1,19 +1,25 @@
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
-from itertools import product
+from itertools import product, repeat
 import json
 from pathlib import Path
 import shutil
 from scrapy.settings import Settings
 
-from ornacodex.utils import get_hash
+from ornacodex.utils import delta_encode, get_entry_key, get_hash
+from ornacodex.utils.artifacts import ArtifactWriter
+from ornacodex.utils.compact import encode_codex
 from ornacodex.utils.converter import Converter, UniqueKeyGenerator
+from ornacodex.utils.delta import apply_codex_delta, apply_locale_delta, codex_delta, locale_delta
+from ornacodex.utils.dict_path import DictPath
 from ornacodex.utils.exctractor import Exctractor
+from ornacodex.utils.feeds import find_feed, iter_feed
+from ornacodex.utils.manifest import CodexFiles
 from ornacodex.utils.path_config import TmpPathConfig
+from ornacodex.utils.search import build_search_index
 from ..spiders import bosses, classes, followers, items, monsters, raids, spells
 
-import glom
-
 
 crawlers = [
     bosses, classes, followers, items,
@@ -24,19 +30,24 @@ crawlers = [
 def load_item_types(itemtypes_dir: Path, languages: list[str]):
     itemtypes = {}
     for language in languages:
-        with open(itemtypes_dir.joinpath(f'{language}.json')) as f:
-            itemtypes[language] = json.load(f)
+        itemtypes[language] = list(iter_feed(find_feed(itemtypes_dir.joinpath(language))))
     return itemtypes
 
 
+def iter_entries(entries_dir: Path, language: str, category: str):
+    # one entry at a time, the last line of an id wins
+    return iter_feed(find_feed(entries_dir.joinpath(language, category)))
+
+
 def load_entries(entries_dir: Path, languages: list[str]):
     entries = defaultdict(dict)
     for (language, crawler) in product(languages, crawlers):
         category: str = crawler.Spider.name
-        with open(entries_dir.joinpath(language, f'{category}.json')) as f:
-            for entry in sorted(json.load(f), key=lambda e: e['id']):
-                key = f"{category}/{entry['id']}"
-                entries[language][key] = entry
+        category_entries = {entry['id']: entry
+                            for entry in iter_entries(entries_dir, language, category)}
+        for id in sorted(category_entries):
+            key = f"{category}/{id}"
+            entries[language][key] = category_entries[id]
     return entries
 
 
@@ -44,6 +55,26 @@ icon_key_generator = UniqueKeyGenerator()
 abilities_key_generator = UniqueKeyGenerator()
 
 
+def load_key_registry(file_path: Path):
+    # keys assigned by earlier runs, so content changes don't rename them
+    if not file_path.exists():
+        return
+    with open(file_path) as f:
+        registry = json.load(f)
+    icon_key_generator.load(registry.get('icons', []))
+    abilities_key_generator.load(registry.get('abilities', []))
+
+
+def save_key_registry(file_path: Path):
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    registry = {
+        'icons': icon_key_generator.dump(),
+        'abilities': abilities_key_generator.dump(),
+    }
+    with open(file_path, 'w') as f:
+        json.dump(registry, f, ensure_ascii=False, indent=4)
+
+
 def get_default_translation():
     return {
         'msg': defaultdict(dict),
@@ -71,9 +102,65 @@ def isSpellKey(key) -> bool:
     return key.startswith('_') and key.endswith(('spell', 'skill'))
 
 
-def scan(settings: Settings, input_dir: Path):
-    base_language = settings.get('BASE_LANGUAGE')
-    languages = settings.get('SUPPORTED_LANGUAGES')
+def get_aligned(aligned: list, path: tuple) -> list:
+    # `aligned` lists hold one value per language, in `languages` order,
+    # None where a language lacks it. Each is walked once, by relative path
+    return [DictPath.get(value, path, default=None) for value in aligned]
+
+
+def set_msg_value(msg: dict, msg_path: str, value):
+    is_empty = DictPath.get(msg, msg_path, default=None) is None
+    if is_empty:
+        if value:
+            DictPath.assign(msg, msg_path, value)
+
+
+def assign_unique_keys(base_entries: dict) -> dict[str, str]:
+    # the only place icon and ability keys are handed out, in entry order;
+    # scan_entries() only looks them up, so a serial scan and categories
+    # scanned apart get the same keys. Returns the category that scans the
+    # stats of each ability
+    icons = []
+    # (icon identifier, description, category, has stats)
+    abilities = []
+    for entry_key, entry in base_entries.items():
+        category = entry_key.split('/')[0]
+        for drop in entry.get('drops') or []:
+            key = Converter.convert_key(drop[0])
+            if key == 'abilities':
+                for base in drop[1]:
+                    icons.append((base.get('name'), base.get('icon')))
+                    abilities.append((icons[-1], base.get('description', ''),
+                                      category, bool(base.get('stats'))))
+            elif key != 'bestial_bond':
+                for d in drop[1]:
+                    if not d.get('href') and d.get('icon'):
+                        icons.append((d.get('name'), d.get('icon')))
+        follower = entry.get('follower')
+        if follower:
+            icons.append(tuple(follower[1].values()))
+
+    icon_key_generator.assign(icons)
+    ability_keys = [(icon_key_generator.get_unique_key(icon), description)
+                    for icon, description, _, _ in abilities]
+    abilities_key_generator.assign(ability_keys)
+
+    owners = dict()
+    for identifier, (_, _, category, has_stats) in zip(ability_keys, abilities):
+        if has_stats:
+            owners.setdefault(abilities_key_generator.get_unique_key(identifier), category)
+    return owners
+
+
+def scan_entries(
+    languages: list[str],
+    shard: list[tuple[str, dict, list]],
+    icon_keys: UniqueKeyGenerator,
+    abilities_keys: UniqueKeyGenerator,
+    owners: dict[str, str],
+):
+    # shard = [(entry key, base entry, the entry in every language)]
+    # keys come from assign_unique_keys(), `owners` too
 
     # icons
     icons = dict()
@@ -94,52 +181,33 @@ def scan(settings: Settings, input_dir: Path):
         if any(new_value):
             value_types[key] = new_value
 
-    entries = load_entries(input_dir.entries, languages)
-
-    # base entries
-    base_entries = entries[base_language]
-    tmp_entries = {key: {} for key in base_entries.keys()}
+    tmp_entries = {entry_key: {} for entry_key, _, _ in shard}
 
     def set_ent(path: str, value):
-        _ = glom.assign(tmp_entries, path, value)
+        _ = DictPath.assign(tmp_entries, path, value)
 
     # translations
-    translations = {lang: get_default_translation() for lang in languages}
-    for lang in languages:
-        for entry_key, entry in entries[lang].items():
-            translations[lang]['entries'][entry_key] = {'name': entry['name']}
-            description = entry.get('description')
-            if description:
-                translations[lang]['entries'][entry_key]['description'] = description
+    translations = {lang: {'msg': defaultdict(dict), 'abilities': dict()}
+                    for lang in languages}
 
     def set_msg(language: str, msg_path: str,  value):
-        msg = translations[language]['msg']
-        is_empty = glom.glom(msg, glom.Coalesce(
-            msg_path, default=None)) is None
-        if is_empty:
-            if value:
-                glom.assign(msg, msg_path, value)
-
-    def set_msg_by_path(msg_path: str, value_path: str):
-        for language in languages:
-            used_entries = entries[language]
-            value = glom.glom(used_entries, glom.Coalesce(
-                value_path, default=None))
+        set_msg_value(translations[language]['msg'], msg_path, value)
+
+    def set_msgs(msg_path: str, values: list):
+        for language, value in zip(languages, values):
             set_msg(language, msg_path, value)
 
     # abilities_stats
     ability_stats = dict()
 
-    def set_ability_stat(ability_key: str, stat: list[str, str], value_path: str):
+    def set_ability_stat(ability_key: str, stat: list[str, str], values: list):
         stats = ability_stats[ability_key]
         key, value = stat
         if key in {'bestial_bond_level', 'mana_rush'}:
             base_value = Converter.convert_key(value)
             set_value_types('abilities.'+key, {'type': 'TEXT'})
             stats[key] = base_value
-            for language in languages:
-                val = glom.glom(entries[language], value_path)
-                set_msg(language, 'stats_text.'+base_value, val)
+            set_msgs('stats_text.'+base_value, values)
             return
 
         # normal type
@@ -155,9 +223,8 @@ def scan(settings: Settings, input_dir: Path):
                 Exctractor.extract_chance(v.strip()) for v in value.split(','))]
             stats[key] = [{'name': buf[0], 'chance': int(buf[1].strip('%') if buf[1] else None)}
                           for buf in base_buffs]
-            for language in languages:
-                buffs = [Exctractor.extract_chance(v.strip()) for v in glom.glom(
-                    entries[language], value_path).split(',')]
+            for language, val in zip(languages, values):
+                buffs = [Exctractor.extract_chance(v.strip()) for v in val.split(',')]
                 for i, base_buf in enumerate(base_buffs):
                     base_name = base_buf[0]
                     set_msg(language, 'status.'+base_name, buffs[i][0])
@@ -168,65 +235,56 @@ def scan(settings: Settings, input_dir: Path):
 
     # abilities
 
-    def set_abilities(entry_key, path):
+    def set_abilities(entry_key: str, base_values: list, aligned_values: list):
         ###
+        category = entry_key.split('/')[0]
         base_abilities = []
-        for index, base in enumerate(glom.glom(base_entries, glom.Coalesce(
-                f'{entry_key}.{path}', default=[]))):
+        for index, base in enumerate(base_values):
             icon = base.get('icon')
-            unique_key = icon_key_generator.generate_unique_key(
+            unique_key = icon_keys.get_unique_key(
                 (base.get('name'), icon))
-            unique_key = abilities_key_generator.generate_unique_key(
+            unique_key = abilities_keys.get_unique_key(
                 (unique_key, base.get('description', ''))
             )
             set_icon(unique_key, icon)
             base_abilities.append(unique_key)
-            # stats
+            # stats, scanned where the ability is first seen
             stats = base.get('stats')
-            if stats and ability_stats.get(unique_key) is None:
+            if stats and ability_stats.get(unique_key) is None and owners[unique_key] == category:
                 ability_stats[unique_key] = {}
-                stats_path = f'{entry_key}.{path}.{index}.stats'
-                base_stats = glom.glom(
-                    base_entries, glom.Coalesce(stats_path, default=[]))
-                for i, stat in enumerate(base_stats):
+                aligned_stats = get_aligned(aligned_values, (index, 'stats'))
+                for i, stat in enumerate(stats):
                     stat_key = Converter.convert_key(stat[0])
-                    stat_key_path = f'{stats_path}.{i}.0'
-                    stat_value_path = f'{stats_path}.{i}.1'
+                    aligned_stat = get_aligned(aligned_stats, (i,))
 
                     # patch for bestial_bond_level
                     if stat_key == 'bestial_bond' and stat[1][-1].isdigit():
                         stat_key = 'bestial_bond_level'
 
-                    set_msg_by_path('stats.'+stat_key,
-                                    stat_key_path)
+                    set_msgs('stats.'+stat_key, get_aligned(aligned_stat, (0,)))
                     if len(stat) == 1:
                         set_value_types('abilities.' +
                                         stat_key, {'type': 'FLAG'})
                         ability_stats[unique_key][stat_key] = True
                     else:
                         set_ability_stat(unique_key, [
-                            stat_key, stat[1]], stat_value_path)
+                            stat_key, stat[1]], get_aligned(aligned_stat, (1,)))
             ###
         set_ent(f'{entry_key}.abilities', base_abilities)
         ###
-        for language in languages:
+        for language, values in zip(languages, aligned_values):
             translation = translations[language]['abilities']
-            for index, value in enumerate(glom.glom(entries[language], glom.Coalesce(f'{entry_key}.{path}', default=[]))):
-                is_empty = glom.glom(translation, glom.Coalesce(
-                    base_abilities[index], default=None)) is None
-                if is_empty:
-                    value_filtered = {k: v for k, v in value.items() if k in {
-                        'name', 'description'}}
-                    glom.assign(
-                        translation, base_abilities[index], value_filtered)
+            for index, value in enumerate(values or []):
+                if translation.get(base_abilities[index]) is None:
+                    translation[base_abilities[index]] = {
+                        k: v for k, v in value.items() if k in {'name', 'description'}}
         ###
 
     # bestial bond
-    def set_bestial_bond(entry_key, path):
+    def set_bestial_bond(entry_key: str, base_values: list, aligned_values: list):
         ###
         base_bbs = []
-        for base_bond in glom.glom(base_entries, glom.Coalesce(
-                f'{entry_key}.{path}', default=[])):
+        for base_bond in base_values:
             tmp = []
             for bb in Exctractor.extract_bond(base_bond['stats']):
                 bb_key = Converter.convert_key(bb['name'])
@@ -248,9 +306,8 @@ def scan(settings: Settings, input_dir: Path):
             base_bbs.append(tmp)
         set_ent(f'{entry_key}.bestial_bond', base_bbs)
         ###
-        for language in languages:
-            for index, bond in enumerate(glom.glom(entries[language], glom.Coalesce(
-                    f'{entry_key}.{path}', default=[]))):
+        for language, values in zip(languages, aligned_values):
+            for index, bond in enumerate(values or []):
                 for i, bb in enumerate(Exctractor.extract_bond(bond['stats'])):
                     base_bb = base_bbs[index][i]
                     if bb['type'] == 'ABILITY':
@@ -267,32 +324,31 @@ def scan(settings: Settings, input_dir: Path):
                             language, f'status.{base_bb["name"]}', bb["name"])
         ###
 
-    def set_stat(entry_key: str, stat: list[str, str], value_path: str):
+    def set_stat(entry_key: str, stat: list[str, str], values: list):
         key, value = stat
         value, conditions = Exctractor.extract_conditions(value)
+        # text and conditions of every language, split once
+        extracted = [Exctractor.extract_conditions(val) if val is not None else (None, None)
+                     for val in values]
         if conditions:
-            is_empty = glom.glom(tmp_entries, glom.Coalesce(
-                f'{entry_key}.stats_conditions', default=None)) is None
+            is_empty = DictPath.get(tmp_entries, f'{entry_key}.stats_conditions', default=None) is None
             if is_empty:
-                glom.assign(tmp_entries, f'{entry_key}.stats_conditions', {})
+                DictPath.assign(tmp_entries, f'{entry_key}.stats_conditions', {})
             base_conds = [Converter.convert_key(cond) for cond in conditions]
-            for language in languages:
-                _, conds = Exctractor.extract_conditions(
-                    glom.glom(entries[language], value_path))
-                for index, cond in enumerate(conds):
+            for language, (_, conds) in zip(languages, extracted):
+                for index, cond in enumerate(conds or []):
                     set_msg(language, 'stats_conditions.' +
                             base_conds[index], cond)
             set_ent(f'{entry_key}.stats_conditions.{key}', base_conds)
 
+        texts = [text for text, _ in extracted]
+
         if key in {'stat_bonus', 'bestial_bond_level'}:
             value_type = {'type': 'TEXT'}
             set_value_types('stats.'+key, value_type)
             base_value = Converter.convert_key(value)
             set_ent(f'{entry_key}.stats.{key}', base_value)
-            for language in languages:
-                value, _ = Exctractor.extract_conditions(
-                    glom.glom(entries[language], value_path))
-                set_msg(language, 'stats_text.' + base_value, value)
+            set_msgs('stats_text.' + base_value, texts)
             return
 
         value_type = get_value_type(value)
@@ -305,34 +361,27 @@ def scan(settings: Settings, input_dir: Path):
         # spells key
         if isSpellKey(key):
             base_value = Converter.convert_key(value)
-            spells = glom.glom(tmp_entries, glom.Coalesce(
-                f'{entry_key}.stats.{key}', default=[]))
+            spells = DictPath.get(tmp_entries, f'{entry_key}.stats.{key}', default=[])
             spells.append({'name': base_value})
             set_ent(f'{entry_key}.stats.{key}', spells)
             set_value_types('stats.'+key, {'type': 'TEXT'})
-            for language in languages:
-                value, _ = Exctractor.extract_conditions(
-                    glom.glom(entries[language], value_path))
-                set_msg(language, 'stats_text.' + base_value, value)
+            set_msgs('stats_text.' + base_value, texts)
             return
 
         # else text
         base_value = Converter.convert_key(value)
         set_ent(f'{entry_key}.stats.{key}', base_value)
         set_value_types('stats.'+key, {'type': 'TEXT'})
-        for language in languages:
-            value, _ = Exctractor.extract_conditions(
-                glom.glom(entries[language], value_path))
-            set_msg(language, 'stats_text.' + base_value, value)
+        set_msgs('stats_text.' + base_value, texts)
 
     # scan started
-    for entry_key, entry in base_entries.items():
+    for entry_key, entry, aligned in shard:
 
         # category = str
         category: str = entry_key.split('/')[0]
         category_key = entry_key+'.category'
         set_ent(category_key, category)
-        set_msg_by_path('category.' + category, category_key)
+        set_msgs('category.' + category, get_aligned(aligned, ('category',)))
 
         # id
         id = entry.get('id')
@@ -354,8 +403,8 @@ def scan(settings: Settings, input_dir: Path):
         if spell_type:
             base_value = Converter.convert_key(spell_type)
             set_ent(entry_key + '.spell_type', base_value)
-            set_msg_by_path('spell_type.'+base_value,
-                            entry_key + '.spell_type')
+            set_msgs('spell_type.'+base_value,
+                     get_aligned(aligned, ('spell_type',)))
 
         # offhand_ability
         offhand_ability = entry.get('ability')
@@ -367,7 +416,7 @@ def scan(settings: Settings, input_dir: Path):
         if exotic:
             exotic_key = entry_key+'.exotic'
             set_ent(exotic_key, 1)
-            set_msg_by_path('meta.exotic', exotic_key)
+            set_msgs('meta.exotic', get_aligned(aligned, ('exotic',)))
         else:
             exotic_key = entry_key+'.exotic'
             if category == 'items':
@@ -385,27 +434,29 @@ def scan(settings: Settings, input_dir: Path):
             entry_stats_key = entry_key + '.stats'
             if any(list(filter(lambda s: s[0] not in {'Targets'}, stats))):
                 set_ent(entry_stats_key, {})
+            aligned_stats = get_aligned(aligned, ('stats',))
             for index, stat in enumerate(stats):
                 stat_key = Converter.convert_key(stat[0])
-                entry_stat_key_path = f'{entry_stats_key}.{index}.0'
-                entry_stat_value_path = f'{entry_stats_key}.{index}.1'
+                aligned_stat = get_aligned(aligned_stats, (index,))
+                stat_keys = get_aligned(aligned_stat, (0,))
+                stat_values = get_aligned(aligned_stat, (1,))
                 # targets, move to meta
                 if stat_key == 'targets':
                     targets = Converter.convert_key(stat[1])
-                    set_msg_by_path('meta.targets', entry_stat_key_path)
-                    set_msg_by_path('targets.'+targets, entry_stat_value_path)
+                    set_msgs('meta.targets', stat_keys)
+                    set_msgs('targets.'+targets, stat_values)
                     set_ent(entry_key+'.targets', targets)
                 # elements
                 elif stat_key == 'element':
                     elements = [Converter.convert_key(
                         elem) for elem in stat[1]]
                     for i, elem in enumerate(elements):
-                        set_msg_by_path('stats_text.' + elem,
-                                        f'{entry_stat_value_path}.{i}')
+                        set_msgs('stats_text.' + elem,
+                                 get_aligned(stat_values, (i,)))
                     set_value_types('stats.' + stat_key, {'type': 'TEXT'})
                     set_ent(f'{entry_stats_key}.element', elements)
                 elif stat_key == 'power':
-                    set_msg_by_path('stats.' + stat_key, entry_stat_key_path)
+                    set_msgs('stats.' + stat_key, stat_keys)
                     set_value_types('stats.' + stat_key, {'type': 'TEXT'})
                     set_ent(f'{entry_stats_key}.power', stat[1])
                 else:
@@ -415,7 +466,7 @@ def scan(settings: Settings, input_dir: Path):
                         stat_key = 'bestial_bond_level'
 
                     # set stats key
-                    set_msg_by_path('stats.' + stat_key, entry_stat_key_path)
+                    set_msgs('stats.' + stat_key, stat_keys)
 
                     # stat_value = Converter.convert_key(stat[1])
                     if len(stat) == 1:
@@ -423,19 +474,21 @@ def scan(settings: Settings, input_dir: Path):
                         set_ent(f'{entry_stats_key}.{stat_key}', True)
                     else:
                         set_stat(entry_key, [
-                                 stat_key, stat[1]], entry_stat_value_path)
+                                 stat_key, stat[1]], stat_values)
 
         # drops = list[tuple[str, list[Any]]]
         drops = entry.get('drops')
         if drops:
+            aligned_drops = get_aligned(aligned, ('drops',))
             for index, drop in enumerate(drops):
                 key = Converter.convert_key(drop[0])
-                set_msg_by_path('meta.'+key, f'{entry_key}.drops.{index}.0')
-                drop_value_path = f'drops.{index}.1'
+                aligned_drop = get_aligned(aligned_drops, (index,))
+                set_msgs('meta.'+key, get_aligned(aligned_drop, (0,)))
+                drop_values = get_aligned(aligned_drop, (1,))
                 if key == 'abilities':
-                    set_abilities(entry_key, drop_value_path)
+                    set_abilities(entry_key, drop[1], drop_values)
                 elif key == 'bestial_bond':
-                    set_bestial_bond(entry_key, drop_value_path)
+                    set_bestial_bond(entry_key, drop[1], drop_values)
                 else:
                     drops_list = []
                     for i, d in enumerate(drop[1]):
@@ -449,15 +502,15 @@ def scan(settings: Settings, input_dir: Path):
                         icon = d.get('icon')
                         chance = d.get('chance')
                         if icon:
-                            unique_key = icon_key_generator.generate_unique_key(
+                            unique_key = icon_keys.get_unique_key(
                                 (d.get('name'), icon))
                             set_icon(unique_key, icon)
                             tmp = {'name': unique_key}
                             if chance:
                                 tmp['chance'] = int(chance.strip('%'))
                             # status
-                            set_msg_by_path('status.'+unique_key,
-                                            f'{entry_key}.drops.{index}.1.{i}.name')
+                            set_msgs('status.'+unique_key,
+                                     get_aligned(drop_values, (i, 'name')))
                             drops_list.append(tmp)
                             continue
 
@@ -479,13 +532,15 @@ def scan(settings: Settings, input_dir: Path):
         follower = entry.get('follower')
         if follower:
             follower_key = entry_key + '.follower'
-            set_msg_by_path('meta.follower', f'{follower_key}.0')
-            unique_key = icon_key_generator.generate_unique_key(
+            aligned_follower = get_aligned(aligned, ('follower',))
+            set_msgs('meta.follower', get_aligned(aligned_follower, (0,)))
+            unique_key = icon_keys.get_unique_key(
                 tuple(follower[1].values())
             )
             set_ent(follower_key, unique_key)
             set_icon(unique_key, follower[1]['icon'])
-            set_msg_by_path(f'follower.'+unique_key, f'{follower_key}.1.name')
+            set_msgs(f'follower.'+unique_key,
+                     get_aligned(aligned_follower, (1, 'name')))
 
         # tags = list[str]
         tags = entry.get('tags')
@@ -493,16 +548,19 @@ def scan(settings: Settings, input_dir: Path):
             tags_list = [Converter.convert_key(tag) for tag in tags]
             tags_key = entry_key + '.tags'
             set_ent(tags_key, tags_list)
+            aligned_tags = get_aligned(aligned, ('tags',))
             for index, tag in enumerate(tags_list):
-                set_msg_by_path('tags.' + tag, f'{tags_key}.{index}')
+                set_msgs('tags.' + tag, get_aligned(aligned_tags, (index,)))
 
         # meta = list[tuple[str, str]]
         metas: list[tuple[str, str]] | None = entry.get('meta')
         if metas:
+            aligned_metas = get_aligned(aligned, ('meta',))
             for index, meta in enumerate(metas):
                 key = Converter.convert_key(meta[0])
                 value_key = entry_key + '.' + key
-                set_msg_by_path('meta.'+key, f'{entry_key}.meta.{index}.0')
+                aligned_meta = get_aligned(aligned_metas, (index,))
+                set_msgs('meta.'+key, get_aligned(aligned_meta, (0,)))
                 if key == 'tier':
                     set_ent(value_key, int(meta[1].strip('★')))
                 elif key == 'hp':
@@ -510,19 +568,96 @@ def scan(settings: Settings, input_dir: Path):
                 else:
                     value = Converter.convert_key(meta[1])
                     set_ent(value_key, value)
-                    set_msg_by_path(f'{key}.{value}',
-                                    f'{entry_key}.meta.{index}.1')
+                    set_msgs(f'{key}.{value}', get_aligned(aligned_meta, (1,)))
+
+    return {
+        'icons': icons,
+        'entries': tmp_entries,
+        'translations': translations,
+        'value_types': value_types,
+        'ability_stats': ability_stats,
+    }
+
+
+def merge_scanned(scanned: dict, partial: dict):
+    # fold the result of a shard into `scanned`, keeping what the shards
+    # before it set first, like scan_entries() does within a shard
+    icons = scanned['icons']
+    for key, icon in partial['icons'].items():
+        if not icons.get(key):
+            icons[key] = icon
+    value_types = scanned['value_types']
+    for key, value_type in partial['value_types'].items():
+        old_value = value_types.get(key)
+        if not (old_value and old_value.get('type')):
+            value_types[key] = value_type
+    for key, stats in partial['ability_stats'].items():
+        scanned['ability_stats'].setdefault(key, stats)
+    scanned['entries'].update(partial['entries'])
+    for language, partial_translation in partial['translations'].items():
+        translation = scanned['translations'][language]
+        for category, msgs in partial_translation['msg'].items():
+            category_msgs = translation['msg'][category]
+            for key, value in msgs.items():
+                category_msgs.setdefault(key, value)
+        for key, value in partial_translation['abilities'].items():
+            translation['abilities'].setdefault(key, value)
+
+
+def scan(settings: Settings, input_dir: Path):
+    base_language = settings.get('BASE_LANGUAGE')
+    languages = settings.get('SUPPORTED_LANGUAGES')
+    workers = settings.getint('CODEX_WORKERS')
+
+    entries = load_entries(input_dir.entries, languages)
+
+    # base entries
+    base_entries = entries[base_language]
+
+    # translations
+    translations = {lang: get_default_translation() for lang in languages}
+    for lang in languages:
+        for entry_key, entry in entries[lang].items():
+            translations[lang]['entries'][entry_key] = {'name': entry['name']}
+            description = entry.get('description')
+            if description:
+                translations[lang]['entries'][entry_key]['description'] = description
+
+    # the entry in every language, walked alongside the base entry
+    shard = [(entry_key, entry, [entries[language].get(entry_key) for language in languages])
+             for entry_key, entry in base_entries.items()]
+    owners = assign_unique_keys(base_entries)
+    if workers > 0:
+        # one shard per category, merged back in category order
+        shards = defaultdict(list)
+        for item in shard:
+            shards[item[0].split('/')[0]].append(item)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(
+                scan_entries, repeat(languages), shards.values(),
+                repeat(icon_key_generator), repeat(abilities_key_generator), repeat(owners)))
+    else:
+        partials = [scan_entries(languages, shard,
+                                 icon_key_generator, abilities_key_generator, owners)]
+
+    scanned = {
+        'icons': dict(),
+        'entries': {key: {} for key in base_entries.keys()},
+        'translations': translations,
+        'value_types': dict(),
+        'ability_stats': dict(),
+    }
+    for partial in partials:
+        merge_scanned(scanned, partial)
+    tmp_entries = scanned['entries']
 
     # events
     unordered_events = {
         lang: {} for lang in languages
     }
 
-    def set_conflict_events(event, index_key):
-        for language in languages:
-            used_entries = entries[language]
-            value = glom.glom(used_entries, glom.Coalesce(
-                index_key, default=None))
+    def set_conflict_events(event, values: list):
+        for language, value in zip(languages, values):
             if unordered_events[language].get(event, None) is None:
                 unordered_events[language][event] = value
 
@@ -531,26 +666,41 @@ def scan(settings: Settings, input_dir: Path):
         if events:
             events_list = [Converter.convert_key(event) for event in events]
             value_key = entry_key+'.events'
-            set_ent(value_key, events_list)
+            DictPath.assign(tmp_entries, value_key, events_list)
+            aligned_events = [DictPath.get(entries[language], (entry_key, 'events'), default=None)
+                              for language in languages]
             if len(events_list) == 1:
-                set_msg_by_path('events.'+events_list[0], value_key + '.0')
+                for language, value in zip(languages, get_aligned(aligned_events, (0,))):
+                    set_msg_value(translations[language]['msg'],
+                                  'events.'+events_list[0], value)
             else:
                 for index, event in enumerate(events_list):
-                    set_conflict_events(event, f'{value_key}.{index}')
+                    set_conflict_events(event, get_aligned(aligned_events, (index,)))
     # mitigate bug of unordered events
     for language, translation in translations.items():
         translation['msg']['events'].update(unordered_events[language])
 
-    item_types = load_item_types(input_dir.itemtypes, languages)
+    scanned['item_types'] = load_item_types(input_dir.itemtypes, languages)
+
+    return scanned
 
-    return {
-        'icons': icons,
-        'entries': tmp_entries,
-        'translations': translations,
-        'value_types': value_types,
-        'ability_stats': ability_stats,
-        'item_types': item_types,
-    }
+
+# field referencing entries: (reverse field set on them, categories not counted),
+# the reverse fields are added in this order; a referencing entry is listed
+# once in the reverse field, in entry order
+reverse_references = {
+    # off_hands items of spells
+    'offhand_ability': ('off_hands', set()),
+    # used_by, spells used by enemies
+    'skills': ('used_by', {'classes'}),
+    # materials
+    'upgrade_materials': ('dismantled_by', set()),
+    # items dropped by monsters, bosses and raids, added to the dropped_by
+    # scraped from the item page
+    'drops': ('dropped_by', set()),
+    # monsters summoned by monsters, bosses and raids
+    'summons': ('summoned_by', set()),
+}
 
 
 def analyze(scanned: dict, settings: Settings):
@@ -574,26 +724,25 @@ def analyze(scanned: dict, settings: Settings):
             is_two_handed = entry.get('stats', {}).get('two_handed') == 1
             entries[entry_key]['two_handed'] = 1 if is_two_handed else 0
 
+    # references: one walk resolves the spells named by entries and collects
+    # every reference to another entry, then the reverse lists are added to
+    # the entries referenced, a relation at a time in entry order (appended
+    # to lists the pages already have, like dropped_by)
+
     # offhand_skills = { name: entry_key }
     skills_filp = {entry['name']: entry_key for entry_key,
                    entry in translations[base_language]['entries'].items()}
+    spell_names = translations[base_language]['msg']['stats_text']
+    references = {reverse: [] for reverse, _ in reverse_references.values()}
 
     for entry_key, entry in entries.items():
         offhand_ability = entry.get('offhand_ability')
         if offhand_ability:
             name = offhand_ability[0] + ' (Off-hand)'
-            spell_key = skills_filp.get(name)
-            spell_entry = entries[spell_key]
-            # add off_hands items to spells
-            if 'off_hands' not in spell_entry:
-                spell_entry['off_hands'] = []
-            spell_entry['off_hands'].append(entry_key)
             # replace offhand_ability
-            entry['offhand_ability'] = spell_key
+            entry['offhand_ability'] = skills_filp.get(name)
 
-    # attached_spells
-    spell_names = translations[base_language]['msg']['stats_text']
-    for entry_key, entry in entries.items():
+        # attached_spells
         if entry['category'] == 'items':
             for key in entry.get('stats', {}).keys():
                 if isSpellKey(key):
@@ -612,25 +761,27 @@ def analyze(scanned: dict, settings: Settings):
                         if spell_key:
                             bond['key'] = spell_key
 
-    # used_by, spells used by enemies
-    for entry_key, entry in entries.items():
-        skills = entry.get('skills')
-        if entry['category'] != 'classes' and skills:
-            for key in skills:
-                spell_entry = entries[key]
-                if 'used_by' not in spell_entry:
-                    spell_entry['used_by'] = []
-                spell_entry['used_by'].append(entry_key)
-
-    # materials
-    for entry_key, entry in entries.items():
-        upgrade_materials = entry.get('upgrade_materials')
-        if upgrade_materials:
-            for key in upgrade_materials:
-                material_entry = entries[key]
-                if 'dismantled_by' not in material_entry:
-                    material_entry['dismantled_by'] = []
-                material_entry['dismantled_by'].append(entry_key)
+        for field, (reverse, skipped_categories) in reverse_references.items():
+            value = entry.get(field)
+            if value and entry['category'] not in skipped_categories:
+                for key in value if isinstance(value, list) else [value]:
+                    # icon only drops / summons are {name, chance}, by icon key
+                    if isinstance(key, dict):
+                        key = key.get('name')
+                    if isinstance(key, str):
+                        references[reverse].append((key, entry_key))
+
+    for reverse, pairs in references.items():
+        listed = {}
+        for key, entry_key in pairs:
+            referenced = entries.get(key)
+            if referenced is None:
+                continue
+            if key not in listed:
+                listed[key] = set(referenced.setdefault(reverse, []))
+            if entry_key not in listed[key]:
+                listed[key].add(entry_key)
+                referenced[reverse].append(entry_key)
 
     # patch value types
     for key in ['follower_stats', 'summon_stats']:
@@ -648,36 +799,53 @@ def analyze(scanned: dict, settings: Settings):
             val = msg['stats'][key]
             msg['stats']['_' + key] = '+' + val
 
-    # get options
-    options_dict_set = defaultdict(set)
+    # get options, with the entries (by number) having each value
+    option_entries = defaultdict(lambda: defaultdict(list))
     options_key_set = {'category', 'tier', 'events', 'exotic',  'item_type',
                        'rarity',  'family', 'place', 'type', 'useable_by', 'two_handed',
                        'causes',  'gives', 'cures', 'immunities', 'summons',  # status
                        'abilities',  # abilities
                        'spell_type', 'targets', 'tags', }
-    for entry in entries.values():
+
+    def add_option(key: str, value, n: int):
+        ids = option_entries[key][value]
+        if not ids or ids[-1] != n:
+            ids.append(n)
+
+    for n, entry in enumerate(entries.values()):
         for key in entry.keys():
             value = entry.get(key)
 
             if key in options_key_set:
                 if isinstance(value, list):
                     for v in value:
-                        options_dict_set[key].add(
-                            v['name'] if isinstance(v, dict) else v
-                        )
+                        add_option(key, v['name'] if isinstance(v, dict) else v, n)
                 else:
-                    options_dict_set[key].add(value)
+                    add_option(key, value, n)
 
             if key == 'stats':
                 stats = value
                 for k in stats.keys():
                     if isSpellKey(k) or k == 'element':
                         for v in stats.get(k, []):
-                            options_dict_set['stats.' + k].add(
-                                v['name'] if isinstance(v, dict) else v
-                            )
+                            add_option('stats.' + k, v['name'] if isinstance(v, dict) else v, n)
 
-    options = {k: sorted(v) for k, v in options_dict_set.items()}
+    options = {k: sorted(v) for k, v in option_entries.items()}
+
+    # inverted index of the options: the sorted entry numbers of each value
+    # and how many of them are in each category, in the order of `options`
+    categories = [entry['category'] for entry in entries.values()]
+    filters = {
+        'postings': {
+            key: [option_entries[key][value] for value in values]
+            for key, values in options.items()
+        },
+        'facets': {
+            key: [dict(Counter(categories[n] for n in option_entries[key][value]))
+                  for value in values]
+            for key, values in options.items()
+        },
+    }
     ###
 
     # get sorts
@@ -697,6 +865,29 @@ def analyze(scanned: dict, settings: Settings):
                     continue
                 sorts_dict_set[category].add('stats.' + key)
     sorts = {k: sorted(v) for k, v in sorts_dict_set.items()}
+
+    # sort orders: the entry numbers of each category by each sort key,
+    # numbers (and flags) ascending then texts, ties by entry number; the
+    # first `present` have the value, the others follow in entry order
+    orders = {}
+    for category, keys in sorts.items():
+        category_entries = [(n, entry) for n, entry in enumerate(entries.values())
+                            if entry['category'] == category]
+        orders[category] = {}
+        for key in keys:
+            ranked, missing = [], []
+            for n, entry in category_entries:
+                value = DictPath.get(entry, key, None)
+                if isinstance(value, (int, float)):
+                    ranked.append((0, value, n))
+                elif isinstance(value, str):
+                    ranked.append((1, value, n))
+                else:
+                    missing.append(n)
+            orders[category][key] = {
+                'present': len(ranked),
+                'ids': delta_encode([n for *_, n in sorted(ranked)] + missing),
+            }
     ###
 
     # trans translations
@@ -737,60 +928,193 @@ def analyze(scanned: dict, settings: Settings):
                 'sorts': sorts,
             }
         },
-        locales
+        locales,
+        filters,
+        orders,
     )
 
 
+def split_categories(entries: list[dict]) -> dict[str, list[dict]]:
+    categories = {}
+    for entry in entries:
+        categories.setdefault(entry['category'], []).append(entry)
+    return categories
+
+
+def save_sharded(codex: dict, locales: dict, writer: ArtifactWriter) -> dict:
+    # `meta.<hash>.json` and `codex/<category>.<hash>.json`, each locale as
+    # `locales/<language>/meta.<hash>.json` (msg and abilities) and
+    # `locales/<language>/<category>.<hash>.json`
+    files = {
+        'codex': {
+            'meta': writer.write_json('meta', codex['meta']),
+            'entries': {
+                category: writer.write_json(f'codex/{category}', entries)
+                for category, entries in split_categories(codex['entries']).items()
+            },
+        },
+        'locales': {},
+    }
+    for language, locale in locales.items():
+        files['locales'][language] = {
+            'meta': writer.write_json(f'{language}/meta', {
+                'msg': locale['msg'],
+                'abilities': locale['abilities'],
+            }, base='locales'),
+            'entries': {
+                category: writer.write_json(f'{language}/{category}', entries, base='locales')
+                for category, entries in split_categories(locale['entries']).items()
+            },
+        }
+    return files
+
+
+def get_build(manifest: dict) -> str:
+    # identifies a build by the codex and locale files the patches describe,
+    # the other files (filters, orders, search, compact) follow from them
+    files = manifest['files']
+    return manifest.get('build') or get_hash(json.dumps(
+        {'codex': files['codex'], 'locales': files['locales']}, sort_keys=True))
+
+
+def patch_paths(patch: dict) -> list[str]:
+    return [patch['codex'], *(f'locales/{f}' for f in patch['locales'].values())]
+
+
+def load_previous(previous_dir: Path) -> dict | None:
+    # read before the output dir is cleared, it may be the same dir
+    if not previous_dir.joinpath('manifest.json').exists():
+        # first build into the dir
+        print(f'No previous build in {previous_dir}, no patches written')
+        return None
+    codex_files = CodexFiles(previous_dir)
+    # with the precompressed siblings they were written with
+    patch_files = {
+        path + suffix: previous_dir.joinpath(path + suffix).read_bytes()
+        for patch in codex_files.manifest.get('patches', []) for path in patch_paths(patch)
+        for suffix in ('', '.gz', '.br') if previous_dir.joinpath(path + suffix).exists()
+    }
+    return {
+        'build': get_build(codex_files.manifest),
+        'codex': codex_files.load_codex(),
+        'locales': dict(codex_files.locales()),
+        'patches': codex_files.manifest.get('patches', []),
+        'patch_files': patch_files,
+        'artifacts': codex_files.manifest.get('artifacts', {}),
+    }
+
+
+def check_patch(patched: dict, content: dict, name: str):
+    # a client applying the patch must get the written file, entry numbers
+    # included; compared as json, the build holds tuples where it reads lists
+    if json.dumps(patched, sort_keys=True) != json.dumps(content, sort_keys=True):
+        raise ValueError(f'patch of {name} does not give the build')
+
+
+def save_patches(previous: dict, build: str, codex: dict, locales: dict,
+                 writer: ArtifactWriter, keep: int) -> list[dict]:
+    # the delta from the previous build and the ones it listed, newest first
+    patches = []
+    if previous['build'] != build:
+        name = f'{previous["build"]}-{build}'
+        codex_patch = codex_delta(previous['codex'], codex)
+        check_patch(apply_codex_delta(previous['codex'], codex_patch), codex, 'codex')
+        locale_patches = {}
+        for language, locale in locales.items():
+            if language in previous['locales']:
+                locale_patches[language] = locale_delta(previous['locales'][language], locale)
+                check_patch(apply_locale_delta(previous['locales'][language], locale_patches[language]),
+                            locale, language)
+        patches.append({
+            'from': previous['build'],
+            'to': build,
+            'codex': writer.write_json(f'delta/codex.{name}', codex_patch),
+            'locales': {
+                language: writer.write_json(f'delta/{language}.{name}', patch, base='locales')
+                for language, patch in locale_patches.items()
+            },
+        })
+    patches = [*patches, *previous['patches']][:keep]
+    kept = {path for patch in patches for path in patch_paths(patch)}
+    for path, content in previous['patch_files'].items():
+        if path.removesuffix('.gz').removesuffix('.br') in kept:
+            writer.root.joinpath(path).parent.mkdir(parents=True, exist_ok=True)
+            writer.root.joinpath(path).write_bytes(content)
+    for path in kept:
+        if path not in writer.artifacts:
+            writer.artifacts[path] = previous['artifacts'].get(path, {})
+    return patches
+
+
 def main(settings: Settings, input: Path = None, output: Path = None):
     input_dir = TmpPathConfig(input or 'tmp')
     output_dir = Path(output or 'output')
+    key_registry = settings.get('KEY_REGISTRY')
+
+    if key_registry:
+        load_key_registry(Path(key_registry))
 
     print('scanning entries...')
     scanned = scan(settings, input_dir)
 
     print('analyzing entries...')
     analyzed = analyze(scanned, settings)
-    codex, locales = analyzed
+    codex, locales, filters, orders = analyzed
+
+    previous = None
+    if settings.get('CODEX_PREVIOUS'):
+        previous = load_previous(Path(settings.get('CODEX_PREVIOUS')))
 
     if (output_dir.exists() and output_dir.is_dir()):
         shutil.rmtree(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     output_dir.joinpath('locales').mkdir()
-
-    files = {
-        'codex': '',
-        'locales': {},
-    }
-
-    # save codex
-    file_content = json.dumps(codex, ensure_ascii=False)
-    file_hash = get_hash(file_content)
-    file_name = f'codex.{file_hash}.json'
-    with open(output_dir.joinpath(file_name), 'w') as f:
-        f.write(file_content)
-    files['codex'] = file_name
-    print('save file:', file_name)
-
-    # save locales
-    for languange, locale in locales.items():
-        file_content = json.dumps(locale, ensure_ascii=False)
-        file_hash = get_hash(file_content)
-        file_name = f'{languange}.{file_hash}.json'
-        with open(output_dir.joinpath('locales', file_name), 'w') as f:
-            f.write(file_content)
-        files['locales'][languange] = file_name
-        print('save file:', file_name)
-
+    writer = ArtifactWriter(output_dir, settings.getbool('OUTPUT_PRECOMPRESS'))
+
+    if settings.getbool('CODEX_SHARDED'):
+        files = save_sharded(codex, locales, writer)
+    else:
+        files = {
+            'codex': writer.write_json('codex', codex),
+            'locales': {
+                language: writer.write_json(language, locale, base='locales')
+                for language, locale in locales.items()
+            },
+        }
+    files['filters'] = writer.write_json('filters', filters)
+    files['orders'] = writer.write_json('orders', orders)
+    if settings.getbool('CODEX_SEARCH'):
+        entry_numbers = {get_entry_key(entry): n for n, entry in enumerate(codex['entries'])}
+        files['search'] = {
+            language: writer.write_json(f'search/{language}',
+                                        build_search_index(locale, entry_numbers),
+                                        base='locales')
+            for language, locale in locales.items()
+        }
+    if settings.getbool('CODEX_COMPACT'):
+        files['compact'] = writer.write_json('codex.compact', encode_codex(codex))
+
+    build = get_build({'files': files})
     manifest = {
         'version': settings.get('VERSION'),
+        'build': build,
         'last_updated': datetime.now(timezone.utc).isoformat(timespec='seconds'),
         'files': files
     }
+    if previous is not None:
+        manifest['patches'] = save_patches(previous, build, codex, locales, writer,
+                                           settings.getint('CODEX_PATCHES'))
+    # sizes of every hashed file and its `.gz` / `.br` siblings, by path
+    manifest['artifacts'] = dict(sorted(writer.artifacts.items()))
 
     with open(output_dir.joinpath('manifest.json'), 'w') as f:
         json.dump(manifest, f, ensure_ascii=False)
     print('save file:', 'manifest.json')
 
+    if key_registry:
+        save_key_registry(Path(key_registry))
+        print('save file:', key_registry)
+
     ###
     print('=== Manifest ===')
     print(json.dumps(manifest, ensure_ascii=False, indent=4))
@@ -9,7 +9,10 @@ from scrapy.crawler import CrawlerRunner
 from scrapy.settings import Settings
 from scrapy.utils.log import configure_logging
 
+from ..utils.archive import ResponseArchive
 from ..utils.exctractor import Exctractor
+from ..utils.feeds import append_feed_file, feed_suffix, find_feed, iter_feed
+from ..utils.incremental import EntryStateStore
 from ..utils.path_config import TmpPathConfig
 
 from ..patches.unindexed_urls import unindexed_urls
@@ -37,6 +40,27 @@ def urls2dict(urls: Iterator[str]):
     return d
 
 
+def entry_ids(files_dir: Path, language: str, category: str) -> list[str]:
+    file_path = find_feed(files_dir.joinpath(language, category))
+    if file_path is None:
+        return []
+    return sorted({entry['id'] for entry in iter_feed(file_path)})
+
+
+def report_changes(store: EntryStateStore, languages: list[str], output: Path):
+    changes = store.report(languages, [crawler.Spider.name for crawler in crawlers])
+    store.close()
+    for category, statuses in changes.items():
+        print(f'{category}:', ', '.join(
+            f'{len(statuses.get(status, []))} {status}'
+            for status in ('added', 'changed', 'unchanged', 'removed')))
+        for status in ('added', 'changed', 'removed'):
+            if any(statuses.get(status, [])):
+                print(f'  {status}:', ', '.join(statuses[status]))
+    with open(output.joinpath('changes.json'), 'w') as f:
+        json.dump(changes, f, ensure_ascii=False, indent=4)
+
+
 def crawl_codex(settings: Settings, output: Path = None, **kwargs):
     patches_enabled = settings.get('PATCHES_ENABLED')
 
@@ -47,9 +71,17 @@ def crawl_codex(settings: Settings, output: Path = None, **kwargs):
 
     base_language = settings.get('BASE_LANGUAGE')
     languages = settings.get('SUPPORTED_LANGUAGES', [])
-
+    # schedule every crawl of a phase at once and join them together
+    concurrent = settings.getbool('CONCURRENT_CRAWL')
+    # only the base language walks the category listings
+    reuse_ids = settings.getbool('REUSE_BASE_IDS')
+
+    feed_format = settings.get('TMP_FEED_FORMAT')
+    # json lines are streamed and appended instead of loaded and rewritten
+    jsonlines = feed_format == 'jsonlines'
+    suffix = feed_suffix(feed_format)
     json_feed = {
-        'format': 'json',
+        'format': feed_format,
         'encoding': 'utf8',
         'store_empty': False,
         'overwrite': True,
@@ -68,27 +100,45 @@ def crawl_codex(settings: Settings, output: Path = None, **kwargs):
 
         # All
         settings['FEEDS'] = {
-            f'{tmp_dir_config.entries}/%(language)s/%(name)s.json': json_feed
+            f'{tmp_dir_config.entries}/%(language)s/%(name)s{suffix}': json_feed
         }
 
         runner.settings = settings
-        for (language, crawler) in product(languages, crawlers):
+        listed = [base_language] if reuse_ids else languages
+        for (language, crawler) in product(listed, crawlers):
             runner.crawl(crawler.Spider, language=language)
+            if not concurrent:
+                yield runner.join()
+
+        if reuse_ids:
             yield runner.join()
+            # request the ids found by the base language in the others
+            for (language, crawler) in product(languages, crawlers):
+                if language == base_language:
+                    continue
+                start_ids = entry_ids(tmp_dir_config.entries,
+                                      base_language, crawler.Spider.name)
+                if len(start_ids) > 0:
+                    runner.crawl(crawler.Spider, language=language,
+                                 start_ids=start_ids)
+                    if not concurrent:
+                        yield runner.join()
 
         # ItemTypes
         settings['FEEDS'] = {
-            f'{tmp_dir_config.itemtypes}/%(language)s.json': json_feed
+            f'{tmp_dir_config.itemtypes}/%(language)s{suffix}': json_feed
         }
         runner.settings = settings
         for language in languages:
             runner.crawl(item_types.Spider, language=language,
                          name_only=(language != base_language))
-            yield runner.join()
+            if not concurrent:
+                yield runner.join()
+        yield runner.join()
 
         # Miss
         settings['FEEDS'] = {
-            f'{tmp_dir_config.miss}/%(language)s/%(name)s.json': json_feed
+            f'{tmp_dir_config.miss}/%(language)s/%(name)s{suffix}': json_feed
         }
         runner.settings = settings
 
@@ -100,37 +150,54 @@ def crawl_codex(settings: Settings, output: Path = None, **kwargs):
         def update_scan(files_dir: Path):
             for crawler in crawlers:
                 category = crawler.Spider.name
-                file_path = files_dir.joinpath(base_language, f'{category}.json')
-                if file_path.exists():
-                    with open(file_path) as f:
-                        entries = json.load(f)
-                        for entry in entries:
-                            indexed.add(f'/codex/{category}/{entry["id"]}/')
-                            for _, drops in entry.get('drops', []):
-                                scanned.update(filter(lambda x: x is not None,
-                                                      (drop.get('href') for drop in drops)))
-
-        def backup(files_dir):
+                file_path = find_feed(files_dir.joinpath(base_language, category))
+                if file_path is not None:
+                    for entry in iter_feed(file_path):
+                        indexed.add(f'/codex/{category}/{entry["id"]}/')
+                        for _, drops in entry.get('drops', []):
+                            scanned.update(filter(lambda x: x is not None,
+                                                  (drop.get('href') for drop in drops)))
+
+        def backup(files_dir, keep=False):
             bak = dict()
             for (language, crawler) in product(languages, crawlers):
                 category = crawler.Spider.name
-                file_path = files_dir.joinpath(language, f'{category}.json')
-                if file_path.exists():
+                file_path = find_feed(files_dir.joinpath(language, category))
+                if file_path is None:
+                    continue
+                if jsonlines:
+                    # only remember where the lines are, the next crawl
+                    # overwrites the feed so set it aside
+                    if not keep:
+                        file_path = file_path.replace(file_path.with_suffix('.bak'))
+                    bak[f'{category}/{language}'] = file_path
+                else:
                     with open(file_path) as f:
-                        entries = json.load(f)
-                        bak[f'{category}/{language}'] = entries
+                        bak[f'{category}/{language}'] = json.load(f)
             return bak
 
         def merge_backup(files_dir, bak):
             for (language, crawler) in product(languages, crawlers):
                 category = crawler.Spider.name
                 name = f'{category}/{language}'
-                file_path = files_dir.joinpath(language, f'{category}.json')
+                file_path = files_dir.joinpath(language, f'{category}{suffix}')
+
+                if jsonlines:
+                    # readers keep the last line of an id, so appended
+                    # backups win as they did in merge2sort
+                    bak_path = bak.get(name)
+                    if bak_path is not None:
+                        file_path.parent.mkdir(parents=True, exist_ok=True)
+                        append_feed_file(file_path, bak_path)
+                        if bak_path.suffix == '.bak':
+                            bak_path.unlink()
+                    continue
+
                 entries_bak = bak.get(name, [])
 
                 if any(entries_bak) and not file_path.exists():
                     file_path.parent.mkdir(parents=True, exist_ok=True)
-                    with open(file_path, 'r+') as f:
+                    with open(file_path, 'w') as f:
                         json.dump(entries_bak, f, ensure_ascii=False, indent=4)
 
                 if file_path.exists():
@@ -165,7 +232,16 @@ def crawl_codex(settings: Settings, output: Path = None, **kwargs):
                 print('Invalid patched entries:', ', '.join(invalid))
                 indexed = indexed - invalid
 
-        merge_backup(tmp_dir_config.entries, backup(tmp_dir_config.miss))
+        merge_backup(tmp_dir_config.entries, backup(tmp_dir_config.miss, keep=True))
+
+        if settings.getbool('INCREMENTAL_ENABLED'):
+            report_changes(EntryStateStore.open(settings.get('INCREMENTAL_STATE')),
+                           languages, tmp_dir_config.root)
+
+        if settings.get('RESPONSE_ARCHIVE'):
+            archive = ResponseArchive.open(settings.get('RESPONSE_ARCHIVE'))
+            archive.prune(languages, [crawler.Spider.name for crawler in crawlers])
+            archive.close()
 
         yield runner.stop()
         reactor.callFromThread(reactor.stop)
@@ -1,10 +1,11 @@
-import json
 from pathlib import Path
 import shutil
 
 from scrapy.settings import Settings
 import tomlkit
 
+from ..utils.manifest import CodexFiles
+
 
 def main(settings: Settings, input: Path = None, output: Path = None):
     input_dir = Path(input or 'output')
@@ -13,11 +14,9 @@ def main(settings: Settings, input: Path = None, output: Path = None):
         shutil.rmtree(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    with open(input_dir.joinpath('manifest.json')) as f:
-        manifest = json.load(f)
+    codex_files = CodexFiles(input_dir)
 
-    with open(input_dir.joinpath(manifest['files']['codex'])) as f:
-        codex = json.load(f)
+    codex = codex_files.load_codex()
     with open(output_dir.joinpath('codex.yaml'), 'w') as f:
         tomlkit.dump({
             **codex,
@@ -25,9 +24,7 @@ def main(settings: Settings, input: Path = None, output: Path = None):
         }, f, sort_keys=True)
 
     output_dir.joinpath('locales').mkdir(parents=True, exist_ok=True)
-    for language, filename in manifest['files']['locales'].items():
-        with open(input_dir.joinpath('locales', filename)) as f:
-            translation = json.load(f)
+    for language, translation in codex_files.locales():
         with open(output_dir.joinpath('locales', f'{language}.toml'), 'w') as f:
             tomlkit.dump({
                 **translation,
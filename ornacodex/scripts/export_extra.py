@@ -5,7 +5,7 @@ import shutil
 from scrapy.settings import Settings
 import tomlkit
 
-from ornacodex.utils import get_hash
+from ornacodex.utils.artifacts import ArtifactWriter
 
 
 def export_enemies(input_dir: Path):
@@ -36,30 +36,20 @@ def main(settings: Settings, input: Path = None, output: Path = None):
     output_dir.mkdir(parents=True, exist_ok=True)
 
     files = {}
+    writer = ArtifactWriter(output_dir, settings.getbool('OUTPUT_PRECOMPRESS'))
 
     enemies = export_enemies(input_dir)
-    file_content = json.dumps(enemies, ensure_ascii=False)
-    file_hash = get_hash(file_content)
-    file_name = f'enemies.{file_hash}.json'
-    with open(output_dir.joinpath(file_name), 'w') as f:
-        f.write(file_content)
-    files['enemies'] = file_name
-    print(f"Converted: enemies -> {file_name}")
+    files['enemies'] = writer.write_json('enemies', enemies)
 
 
     boss_scaling = export_boss_scaling(input_dir)
-    file_content = json.dumps(boss_scaling, ensure_ascii=False)
-    file_hash = get_hash(file_content)
-    file_name = f'boss_scaling.{file_hash}.json'
-    with open(output_dir.joinpath(file_name), 'w') as f:
-        f.write(file_content)
-    files['boss_scaling'] = file_name
-    print(f"Converted: boss_scaling -> {file_name}")
+    files['boss_scaling'] = writer.write_json('boss_scaling', boss_scaling)
 
     manifest = {
         'version': settings.get('VERSION'),
         'last_updated': datetime.now(timezone.utc).isoformat(timespec='seconds'),
-        'files': files
+        'files': files,
+        'artifacts': writer.artifacts,
     }
 
     file_name = 'manifest.json'
@@ -0,0 +1,15 @@
+from pathlib import Path
+
+from scrapy.settings import Settings
+from scrapy.utils.project import data_path
+
+from ..utils.httpcache import export_cache
+
+
+def run(settings: Settings, input: Path = None, output: Path = None, **kwargs):
+    cachedir = input or Path(data_path(settings.get('HTTPCACHE_DIR')))
+    file_path = output or Path('httpcache.sqlite')
+    counts = export_cache(cachedir, file_path)
+    for category, count in counts.items():
+        print(f'{category}: {count}')
+    print(f'Exported {sum(counts.values())} responses to {file_path}')
@@ -8,6 +8,8 @@ from scrapy.utils.log import configure_logging
 
 from ..spiders import images
 from ..patches.image_urls import image_urls
+from ..utils.image_store import ImageStore
+from ..utils.manifest import CodexFiles
 
 from twisted.internet import asyncioreactor
 asyncioreactor.install()
@@ -27,6 +29,17 @@ def crawl_images(settings: Settings, icons: list[str]):
     crawl()
     reactor.run()
 
+def sync_images(settings: Settings, icons: list[str], output_dir: Path):
+    # only new or changed icons are downloaded into IMAGE_STORE, all of them
+    # are then linked into `output_dir`
+    icons = list(dict.fromkeys(icon for icon in icons if icon))
+    crawl_images(settings, icons)
+    store = ImageStore.open(settings.get('IMAGE_STORE'))
+    missing = store.materialize(icons, output_dir)
+    store.close()
+    if any(missing):
+        print('Missing icons:', ', '.join(missing))
+
 def main(settings: Settings, input: Path = None, output: Path = None):
     input_dir = Path(input or 'output')
     output_dir = Path(output or 'build')
@@ -34,18 +47,13 @@ def main(settings: Settings, input: Path = None, output: Path = None):
         shutil.rmtree(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    with open(input_dir.joinpath('manifest.json')) as f:
-        manifest = json.load(f)
-
-    with open(input_dir.joinpath(manifest['files']['codex'])) as f:
-        codex = json.load(f)
-        icons = codex['meta']['icons'].values()
-        entry_icons = [entry['icon'] for entry in codex['entries']]
+    codex = CodexFiles(input_dir).load_codex()
+    icons = codex['meta']['icons'].values()
+    entry_icons = [entry['icon'] for entry in codex['entries']]
     
     images = [*icons, *entry_icons, *image_urls]
 
-    settings.update({'FILES_STORE': str(output_dir)})
-    crawl_images(settings, images)
+    sync_images(settings, images, output_dir)
 
     manifest = {
         'last_updated': datetime.now(timezone.utc).isoformat(timespec='seconds'),
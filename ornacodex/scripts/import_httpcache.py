@@ -0,0 +1,19 @@
+from pathlib import Path
+
+from scrapy.settings import Settings
+from scrapy.utils.project import data_path
+
+from ..utils.httpcache import import_cache, import_filesystem_cache
+
+
+def run(settings: Settings, input: Path = None, output: Path = None, **kwargs):
+    # `input`: a file of export_httpcache, or a FilesystemCacheStorage dir
+    file_path = input or Path('httpcache.sqlite')
+    cachedir = output or Path(data_path(settings.get('HTTPCACHE_DIR'), createdir=True))
+    if file_path.is_dir():
+        counts = import_filesystem_cache(file_path, cachedir)
+    else:
+        counts = import_cache(file_path, cachedir)
+    for category, count in counts.items():
+        print(f'{category}: {count}')
+    print(f'Imported {sum(counts.values())} responses to {cachedir}')
@@ -1,31 +1,10 @@
 import json
 from pathlib import Path
 import shutil
-from scrapy.crawler import CrawlerRunner
 from scrapy.settings import Settings
-from scrapy.utils.log import configure_logging
 
-from ornacodex.spiders import images
-
-from twisted.internet import asyncioreactor
-asyncioreactor.install()
-
-
-def crawl_images(settings: Settings, icons: list[str]):
-    from twisted.internet import reactor, defer
-
-    configure_logging()
-
-    @defer.inlineCallbacks
-    def crawl():
-        runner = CrawlerRunner(settings=settings)
-        runner.crawl(images.Spider, images=icons)
-        yield runner.join()
-
-        reactor.callFromThread(reactor.stop)
-
-    crawl()
-    reactor.run()
+from ..utils.manifest import CodexFiles
+from .images import sync_images
 
 
 def main(settings: Settings, input: Path = None, output: Path = None):
@@ -35,30 +14,22 @@ def main(settings: Settings, input: Path = None, output: Path = None):
         shutil.rmtree(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    with open(input_dir.joinpath('manifest.json')) as f:
-        manifest = json.load(f)
+    codex_files = CodexFiles(input_dir)
 
     # ToDo: need update
-    with open(input_dir.joinpath(manifest['files']['codex'])) as f:
-        codex = json.load(f)
-        raids = {v['id']: {
-            'tier': v['tier'],
-            'icon': v['icon'],
-            'hp': v['hp'],
-            'name': {}
-        } for v in filter(lambda e: e['category'] == 'raids', codex['entries'])}
-
-    for language, filename in manifest['files']['locales'].items():
-        with open(input_dir.joinpath('locales', filename)) as f:
-            translation = json.load(f)
-            for v in filter(lambda e: e['category'] == 'raids', translation['entries']):
-                raids[v['id']]['name'][language] = v['name']
-
-    settings.update(
-        {
-            'FILES_STORE': str(output_dir),
-        })
-    crawl_images(settings, [r['icon'] for r in raids.values()])
+    codex = codex_files.load_codex(['raids'])
+    raids = {v['id']: {
+        'tier': v['tier'],
+        'icon': v['icon'],
+        'hp': v['hp'],
+        'name': {}
+    } for v in codex['entries']}
+
+    for language, translation in codex_files.locales(['raids']):
+        for v in translation['entries']:
+            raids[v['id']]['name'][language] = v['name']
+
+    sync_images(settings, [r['icon'] for r in raids.values()], output_dir)
 
     with open(output_dir.joinpath('realm.json'), 'w') as f:
         json.dump(raids, f, ensure_ascii=False)
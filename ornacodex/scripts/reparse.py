@@ -0,0 +1,162 @@
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+from pathlib import Path
+import shutil
+
+from itemadapter import is_item, ItemAdapter
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
+
+from ..utils.archive import ResponseArchive
+from ..utils.feeds import feed_suffix, find_feed, iter_feed
+from ..utils.path_config import TmpPathConfig
+
+from ..spiders import bosses, classes, followers, items, monsters, raids, spells
+
+crawlers = {
+    crawler.Spider.name: crawler for crawler in (
+        bosses, classes, followers, items,
+        monsters, raids, spells
+    )
+}
+
+# spider per (category, language) of a worker process
+spiders = {}
+
+# entry pages sent to a worker at a time
+batch_size = 200
+
+
+def get_spider(language: str, category: str, category_page: tuple[str, str, bytes]):
+    key = (category, language)
+    if key not in spiders:
+        spider = crawlers[category].Spider(language=language)
+        url, encoding, body = category_page
+        spider.parse_category(HtmlResponse(url=url, body=body, encoding=encoding))
+        spiders[key] = spider
+    return spiders[key]
+
+
+def parse_batch(language: str, category: str, category_page: tuple[str, str, bytes],
+                pages: list[tuple[str, str, bytes]]) -> list[dict]:
+    # the `parse_item` callback of the spider on archived entry pages
+    spider = get_spider(language, category, category_page)
+    parsed = []
+    for url, encoding, body in pages:
+        response = HtmlResponse(url=url, body=body, encoding=encoding)
+        for i in spider.parse_item(response):
+            if is_item(i):
+                parsed.append(ItemAdapter(i).asdict())
+    return parsed
+
+
+def iter_batches(archive: ResponseArchive, languages: list[str]):
+    for language, category in archive.groups():
+        if language not in languages or category not in crawlers:
+            continue
+        category_page = next(archive.iter(language, category, 'category'), None)
+        if category_page is None:
+            print(f'No category page archived: {category}/{language}')
+            continue
+        batch = []
+        for page in archive.iter(language, category, 'entry'):
+            batch.append(page)
+            if len(batch) >= batch_size:
+                yield language, category, category_page, batch
+                batch = []
+        if any(batch):
+            yield language, category, category_page, batch
+
+
+def write_feed(file_path: Path, entries: list[dict], jsonlines: bool):
+    # sorted by id as the download leaves them once the miss phase is merged
+    entries = sorted({entry['id']: entry for entry in entries}.values(), key=lambda x: x['id'])
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, 'w') as f:
+        if jsonlines:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        else:
+            json.dump(entries, f, ensure_ascii=False, indent=4)
+
+
+def load_feeds(tmp_dir_config: TmpPathConfig, languages: list[str]) -> dict:
+    # (language, category) -> {id: entry} of the entry feeds of a tmp dir
+    feeds = {}
+    for language in languages:
+        for category in crawlers:
+            file_path = find_feed(tmp_dir_config.entries.joinpath(language, category))
+            if file_path is not None:
+                feeds[(language, category)] = {entry['id']: entry for entry in iter_feed(file_path)}
+    return feeds
+
+
+def check_feeds(expected: dict, written: dict) -> bool:
+    # the reparsed entries against the ones of the download, by id
+    same = True
+    for language, category in sorted(expected.keys() | written.keys()):
+        old = expected.get((language, category), {})
+        new = written.get((language, category), {})
+        differ = sorted(id for id in old.keys() | new.keys() if old.get(id) != new.get(id))
+        if any(differ):
+            print(f'{category}/{language}: {len(differ)} entries differ: {", ".join(differ[:10])}')
+            same = False
+    return same
+
+
+def reparse(settings: Settings, input: Path = None, output: Path = None):
+    archive_path = settings.get('RESPONSE_ARCHIVE')
+    if not archive_path or not Path(archive_path).exists():
+        print(f'No response archive: {archive_path}')
+        exit(1)
+    archive = ResponseArchive.open(archive_path)
+
+    languages = settings.get('SUPPORTED_LANGUAGES', [])
+    feed_format = settings.get('TMP_FEED_FORMAT')
+    suffix = feed_suffix(feed_format)
+
+    check = settings.getbool('REPARSE_CHECK')
+    if check:
+        if input is None:
+            print('--check needs the tmp dir of the download as --input')
+            exit(1)
+        # read before the output entries are removed, input may be the output
+        expected = load_feeds(TmpPathConfig(input), languages)
+
+    tmp_dir_config = TmpPathConfig(output or 'tmp')
+    if tmp_dir_config.entries.exists():
+        shutil.rmtree(tmp_dir_config.entries)
+    if input is not None and Path(input).resolve() != tmp_dir_config.root.resolve():
+        # item types are listings, not archived; take them from the last download
+        input_dir_config = TmpPathConfig(input)
+        if input_dir_config.itemtypes.exists():
+            shutil.rmtree(tmp_dir_config.itemtypes, ignore_errors=True)
+            shutil.copytree(input_dir_config.itemtypes, tmp_dir_config.itemtypes)
+
+    parsed = {}
+    batches = iter_batches(archive, languages)
+    workers = settings.getint('CODEX_WORKERS') or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            ((language, category), executor.submit(parse_batch, language, category, category_page, pages))
+            for language, category, category_page, pages in batches
+        ]
+        for key, future in futures:
+            parsed.setdefault(key, []).extend(future.result())
+    archive.close()
+
+    for (language, category), entries in parsed.items():
+        write_feed(tmp_dir_config.entries.joinpath(language, f'{category}{suffix}'),
+                   entries, feed_format == 'jsonlines')
+        print(f'{category}/{language}: {len(entries)}')
+
+    if check:
+        if not check_feeds(expected, load_feeds(tmp_dir_config, languages)):
+            print('Reparsed entries differ from the download')
+            exit(1)
+        print('Reparsed entries match the download')
+
+
+def run(settings: Settings, **kwargs):
+    reparse(settings, **kwargs)
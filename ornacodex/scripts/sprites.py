@@ -0,0 +1,137 @@
+import hashlib
+from io import BytesIO
+import json
+import math
+import os
+from pathlib import Path
+import shutil
+from scrapy.settings import Settings
+
+
+def icon_group(icon: str) -> str:
+    # `/img/items/sword.png` -> `items`, auras are all in `fx`
+    return icon.split('/')[-2]
+
+
+def assign_atlases(hashes: dict[str, str], previous: dict, max_icons: int) -> dict[str, list[str]]:
+    # icons stay in the atlas they were in, new ones fill the first atlas of
+    # their group with room, so a few new icons only touch a few atlases
+    atlases = {}
+    for name, atlas in previous.get('atlases', {}).items():
+        atlases[name] = [icon for icon in atlas['icons']
+                         if icon in hashes and icon_group(icon) == atlas['group']]
+    assigned = {icon for icons in atlases.values() for icon in icons}
+    for icon in sorted(hashes):
+        if icon in assigned:
+            continue
+        group = icon_group(icon)
+        n = 0
+        while len(atlases.get(f'{group}-{n}', [])) >= max_icons:
+            n += 1
+        atlases.setdefault(f'{group}-{n}', []).append(icon)
+    return {name: sorted(icons) for name, icons in sorted(atlases.items()) if any(icons)}
+
+
+def render_atlas(Image, files: list[Path]) -> tuple[bytes, list[tuple[int, int, int, int]]]:
+    # a grid of cells as large as the largest icon
+    images = [Image.open(file_path).convert('RGBA') for file_path in files]
+    cell_w = max(image.width for image in images)
+    cell_h = max(image.height for image in images)
+    columns = math.ceil(math.sqrt(len(images)))
+    rows = math.ceil(len(images) / columns)
+    atlas = Image.new('RGBA', (columns * cell_w, rows * cell_h))
+    boxes = []
+    for i, image in enumerate(images):
+        x, y = i % columns * cell_w, i // columns * cell_h
+        atlas.paste(image, (x, y))
+        boxes.append((x, y, image.width, image.height))
+    data = BytesIO()
+    atlas.save(data, format='PNG', optimize=True)
+    return data.getvalue(), boxes
+
+
+def publish(sprite_dir: Path, output_dir: Path, file_names: list[str]):
+    # hardlinks the atlases and the map into the output, as the image store does
+    if output_dir.exists() and output_dir.resolve() != sprite_dir.resolve():
+        shutil.rmtree(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for file_name in file_names:
+        file_path = output_dir.joinpath(file_name)
+        if file_path.exists():
+            continue
+        try:
+            os.link(sprite_dir.joinpath(file_name), file_path)
+        except OSError:
+            # another filesystem
+            shutil.copyfile(sprite_dir.joinpath(file_name), file_path)
+
+
+def main(settings: Settings, input: Path = None, output: Path = None):
+    try:
+        from PIL import Image
+    except ImportError:
+        print('sprites needs Pillow: uv sync --extra sprites')
+        exit(1)
+
+    input_dir = Path(input or 'build')
+    # published next to the icons
+    output_dir = Path(output or input_dir.joinpath('sprites'))
+    # rendered atlases and their map, kept out of the images output, which
+    # `images` rebuilds every run
+    sprite_dir = Path(settings.get('SPRITE_DIR'))
+    sprite_dir.mkdir(parents=True, exist_ok=True)
+    max_icons = settings.getint('SPRITE_ATLAS_ICONS')
+
+    files = {
+        '/' + file_path.relative_to(input_dir).as_posix(): file_path
+        for file_path in sorted(input_dir.rglob('*.png'))
+        if output_dir.resolve() not in file_path.resolve().parents
+        and sprite_dir.resolve() not in file_path.resolve().parents
+    }
+    hashes = {icon: hashlib.sha256(file_path.read_bytes()).hexdigest()[:16]
+              for icon, file_path in files.items()}
+
+    map_path = sprite_dir.joinpath('sprites.json')
+    previous = {}
+    if map_path.exists():
+        with open(map_path) as f:
+            previous = json.load(f)
+
+    sprites = {'atlases': {}, 'icons': {}}
+    rendered = 0
+    for name, icons in assign_atlases(hashes, previous, max_icons).items():
+        members = {icon: hashes[icon] for icon in icons}
+        old = previous.get('atlases', {}).get(name)
+        if old is not None and old['icons'] == members and sprite_dir.joinpath(old['file']).exists():
+            # same icons with the same content
+            sprites['atlases'][name] = old
+            for icon in icons:
+                sprites['icons'][icon] = previous['icons'][icon]
+            continue
+
+        data, boxes = render_atlas(Image, [files[icon] for icon in icons])
+        file_name = f'{name}.{hashlib.sha256(data).hexdigest()[:8]}.png'
+        sprite_dir.joinpath(file_name).write_bytes(data)
+        rendered += 1
+        sprites['atlases'][name] = {
+            'file': file_name,
+            'group': icon_group(icons[0]),
+            'icons': members,
+        }
+        for icon, (x, y, w, h) in zip(icons, boxes):
+            sprites['icons'][icon] = {'atlas': name, 'x': x, 'y': y, 'w': w, 'h': h}
+
+    used = {atlas['file'] for atlas in sprites['atlases'].values()}
+    for file_path in sprite_dir.glob('*.png'):
+        if file_path.name not in used:
+            file_path.unlink()
+
+    with open(map_path, 'w') as f:
+        json.dump(sprites, f, ensure_ascii=False)
+    publish(sprite_dir, output_dir, [*sorted(used), map_path.name])
+    print(f'Sprites: {len(sprites["icons"])} icons in {len(sprites["atlases"])} atlases, '
+          f'{rendered} rendered')
+
+
+def run(settings: Settings, **kwargs):
+    main(settings=settings, **kwargs)
@@ -1,10 +1,10 @@
-import json
 from pathlib import Path
 from itertools import batched
 from scrapy.settings import Settings
 import tomlkit
 
 from ornacodex.utils import get_entry_key
+from ornacodex.utils.manifest import CodexFiles
 from ornacodex.utils.path_config import ExtraPathConfig
 
 
@@ -92,21 +92,14 @@ def main(settings: Settings, input: Path = None, output: Path = None):
     output_dir = Path(output or 'extra')
     extra_dir = ExtraPathConfig(output_dir)
 
-    with open(input_dir.joinpath('manifest.json')) as f:
-        manifest = json.load(f)
-
-    with open(input_dir.joinpath(manifest['files']['codex'])) as f:
-        codex = json.load(f)
-        entries = codex['entries']
+    codex_files = CodexFiles(input_dir)
+    entries = codex_files.load_codex()['entries']
 
     translations = {}
-    for language, filename in manifest['files']['locales'].items():
-        translations[language] = {}
-        with open(input_dir.joinpath('locales', filename)) as f:
-            translation = json.load(f)
-            translations[language] = {
-                get_entry_key(ent): ent['name'] for ent in translation['entries']
-            }
+    for language, translation in codex_files.locales():
+        translations[language] = {
+            get_entry_key(ent): ent['name'] for ent in translation['entries']
+        }
     print('Updating Enemies...')
     update_enemies(entries, translations, extra_dir)
     print('Enemies Updated!')
@@ -48,12 +48,20 @@ CONCURRENT_REQUESTS = 24
 #SPIDER_MIDDLEWARES = {
 #    "ornacodex.middlewares.OrnacodexSpiderMiddleware": 543,
 #}
+SPIDER_MIDDLEWARES = {
+    "ornacodex.middlewares.IncrementalSpiderMiddleware": 543,
+}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 #DOWNLOADER_MIDDLEWARES = {
 #    "ornacodex.middlewares.OrnacodexDownloaderMiddleware": 543,
 #}
+DOWNLOADER_MIDDLEWARES = {
+    "ornacodex.middlewares.IncrementalDownloaderMiddleware": 580,
+    "ornacodex.middlewares.ResponseArchiveMiddleware": 585,
+    "ornacodex.middlewares.GlobalConcurrencyMiddleware": 1000,
+}
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
@@ -100,4 +108,54 @@ SUPPORTED_LANGUAGES = [BASE_LANGUAGE, 'zh-hans', 'zh-hant']
 VERSION = '2.0.0'
 
 # patched urls
-PATCHES_ENABLED = True
\ No newline at end of file
+PATCHES_ENABLED = True
+
+# listing pages kept in flight when the page count is unknown
+PAGINATION_WINDOW = 8
+
+# other languages request the entry ids listed in the base language
+REUSE_BASE_IDS = False
+
+# revalidate entries against the state kept from the last run
+INCREMENTAL_ENABLED = False
+INCREMENTAL_STATE = 'state/incremental.sqlite'
+
+# raw category / entry responses of the last download, for `reparse` (None: not kept)
+RESPONSE_ARCHIVE = 'state/responses.sqlite'
+# reparse: check the reparsed entries against those of the input tmp dir
+REPARSE_CHECK = False
+
+# icons downloaded by `images` / `realm_raids`, by content hash
+IMAGE_STORE = 'state/images'
+
+# sprites: icons packed in one atlas at most
+SPRITE_ATLAS_ICONS = 256
+# sprites: rendered atlases and `sprites.json`, kept between runs so only the
+# changed atlases are rendered again (published to `<images output>/sprites`)
+SPRITE_DIR = 'state/sprites'
+
+# feed format of the tmp dir: json | jsonlines
+TMP_FEED_FORMAT = 'json'
+
+# codex: scan each category in one of this many processes (0: in process)
+CODEX_WORKERS = 0
+# codex: write codex and locales per category (manifest lists the shards)
+CODEX_SHARDED = False
+# codex: also write the entries interned and keyed by number (`codex.compact.<hash>.json`)
+CODEX_COMPACT = False
+# codex: also write a search index of names and descriptions per locale
+CODEX_SEARCH = False
+# codex: output dir of the previous build to write delta patches from (None: no patches)
+CODEX_PREVIOUS = None
+# codex: patches listed in the manifest, the older ones are dropped
+CODEX_PATCHES = 10
+# codex, export_extra: write `.gz` (and `.br` with brotli installed) next to the
+# hashed json files, their sizes are listed in the manifest
+OUTPUT_PRECOMPRESS = True
+# codex: keys given to icons / abilities by earlier runs (None: not kept)
+KEY_REGISTRY = None
+
+# run all crawls of a phase on one runner at once
+CONCURRENT_CRAWL = False
+# requests in flight shared by all crawlers (default: CONCURRENT_REQUESTS)
+GLOBAL_CONCURRENT_REQUESTS = None
\ No newline at end of file
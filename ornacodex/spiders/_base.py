@@ -2,15 +2,54 @@ from abc import abstractmethod
 from collections.abc import Iterable
 import scrapy
 
+from twisted.python.failure import Failure
 from scrapy.http.request import Request
 from scrapy.http.response import Response
 from scrapy.utils.project import get_project_settings
 
+from ..utils.exctractor import Exctractor
 from ..utils.url_utils import UrlBuilder
 
 settings = get_project_settings()
 
 
+class Pagination:
+    """Listing pages to request, fanned out instead of chained one by one.
+
+    Keeps `window` pages in flight ahead of the last non-empty page, and
+    requests every page up to the highest page the pagers link to. That count
+    is a lower bound (a pager may only link "next" or a few pages), raised by
+    every listing page. Nothing past the first empty or failed page is
+    requested.
+    """
+
+    def __init__(self, window: int, page_count: int | None = None):
+        self.window = max(window, 1)
+        self.page_count = page_count
+        self.end: int | None = None
+        self.scheduled = 0
+
+    def start(self) -> range:
+        return self.extend(max(self.page_count or 0, self.window))
+
+    def next_pages(self, page: int, has_entries: bool, page_count: int | None = None) -> range:
+        if not has_entries:
+            self.stop(page)
+            return range(0)
+        self.page_count = max(self.page_count or 0, page_count or 0) or None
+        return self.extend(max(self.page_count or 0, page + self.window))
+
+    def stop(self, page: int):
+        self.end = page if self.end is None else min(self.end, page)
+
+    def extend(self, target: int) -> range:
+        if self.end is not None:
+            target = min(target, self.end - 1)
+        pages = range(self.scheduled + 1, target + 1)
+        self.scheduled = max(self.scheduled, target)
+        return pages
+
+
 class BaseSpider(scrapy.Spider):
     name = "_base"
     allowed_domains = []
@@ -36,47 +75,63 @@ class BaseSpider(scrapy.Spider):
             method='GET',
             formdata={'lang': self.language},
             callback=self.parse_pre,
+            meta={'category': True},
         )
 
-    def parse_pre(self, response: Response):
+    def parse_category(self, response: Response):
         self.category_text = response.xpath(
             '//h1[@class="herotext"]').xpath('string()').get().strip()
+
+    def parse_pre(self, response: Response):
+        self.parse_category(response)
         if any(self.start_ids):
             for id in self.start_ids:
                 yield scrapy.FormRequest(
-                    f"{self.category_url}/{id}",
+                    f"{self.category_url}/{id}/",
                     method='GET',
                     formdata={'lang': self.language},
                     callback=self.parse_item,
+                    meta={'entry': True},
                 )
         else:
-            yield self.parse(response)
+            yield from self.parse(response)
 
-    def parse(self, response: Response) -> scrapy.FormRequest:
-        page = response.meta.get("page") or 1
-        return scrapy.FormRequest(
-            url=self.category_url,
-            method='GET',
-            formdata={'p': str(page), 'lang': self.language},
-            callback=self.parse_page,
-            errback=self.parse_err,
-            meta={'page': page+1}
+    def parse(self, response: Response) -> Iterable[scrapy.FormRequest]:
+        self.pagination = Pagination(
+            self.settings.getint('PAGINATION_WINDOW'),
+            Exctractor.extract_page_count(response.xpath('//a/@href').getall())
         )
+        return self.request_pages(self.pagination.start())
+
+    def request_pages(self, pages: Iterable[int]) -> Iterable[scrapy.FormRequest]:
+        for page in pages:
+            yield scrapy.FormRequest(
+                url=self.category_url,
+                method='GET',
+                formdata={'p': str(page), 'lang': self.language},
+                callback=self.parse_page,
+                errback=self.parse_err,
+                meta={'page': page}
+            )
 
     def parse_page(self, response: Response):
-        for entry in response.xpath('//div[@class="codex-entries"]/a'):
+        entries = response.xpath('//div[@class="codex-entries"]/a')
+        for entry in entries:
             id = entry.attrib['href']
             yield scrapy.FormRequest(
                 f"{UrlBuilder.base}{id}",
                 method='GET',
                 formdata={'lang': self.language},
                 callback=self.parse_item,
+                meta={'entry': True},
             )
-        yield self.parse(response)
+        yield from self.request_pages(self.pagination.next_pages(
+            response.meta['page'], any(entries),
+            Exctractor.extract_page_count(response.xpath('//a/@href').getall())))
 
     @abstractmethod
     def parse_item(self, response: Response):
         pass
 
-    def parse_err(self, response: Response):
-        pass
+    def parse_err(self, failure: Failure):
+        self.pagination.stop(failure.request.meta['page'])
@@ -2,6 +2,8 @@ from scrapy.http.response import Response
 
 from ..utils.url_utils import UrlParser
 from ..utils.exctractor import Exctractor
+from ..utils import selectors as xp
+from ..utils.selectors import CodexPage
 from ..items import Bosses
 
 from ._base import BaseSpider
@@ -18,47 +20,34 @@ class Spider(BaseSpider):
         id = response.url.split('/')[-2]
         struct['id'] = id
 
-        name = response.xpath('//h1').xpath('string()').get().strip()
+        page = CodexPage(response)
+
+        name = page.name
         struct['name'] = name
 
-        icon = response.xpath("//div[@class='codex-page-icon']/img/@src").get()
+        icon = page.icon
         struct['icon'] = UrlParser.icon(icon)
 
-        events = response.xpath(
-            '//div[@class="codex-page-description codex-page-description-highlight"]').xpath('string()')
+        events = page.events
         if any(events):
             struct['events'] = sorted(e.strip() for e in Exctractor.extract_kv(
-                events.get().strip())[-1].split('/'))
+                events[0].strip())[-1].split('/'))
 
-        meta = response.xpath(
-            "//div[@class='codex-page-meta'] | //div[@class='codex-page-description' and not(descendant::*[@class='drop'])]").xpath('string()').getall()
+        meta = xp.texts(page.meta_and_descriptions())
         struct['meta'] = [Exctractor.extract_kv(m.strip()) for m in meta]
         
-        follower = response.xpath("//div[@class='codex-page-description' and descendant::*[@class='drop']]")
-        if any(follower):
+        follower = page.descriptions(with_drop=True)
+        if len(follower) > 0:
             struct['follower'] = Exctractor.extract_follower(follower)
 
-        aura = response.xpath(
-            "//div[@class='codex-page-icon']/img/@class").get().strip()
+        aura = page.aura.strip()
         if any(aura):
             # struct['aura'] = aura
             # patch for `kin-of-kerberos`
             struct['aura'] = aura.split()[-1]
 
-        drops = response.xpath("//div[@class='codex-page'][1]/h4")
+        drops = Exctractor.extract_drops(page.root)
         if any(drops):
-            tmp = []
-            for drop in drops:
-                drop_name = Exctractor.extract_kv(
-                    drop.xpath('string()').get())[0].strip()
-                d = drop.xpath("./following-sibling::*[1]")
-                d_list = []
-                while any(d):
-                    if any(d.xpath('self::hr | self::h4')):
-                        break
-                    d_list.append(Exctractor.extract_drop(d))
-                    d = d.xpath("./following-sibling::*[1]")
-                tmp.append((drop_name, d_list))
-            struct['drops'] = tmp
+            struct['drops'] = drops
 
         yield Bosses(struct)
@@ -2,6 +2,7 @@ from scrapy.http.response import Response
 
 from ..utils.url_utils import UrlParser
 from ..utils.exctractor import Exctractor
+from ..utils.selectors import CodexPage
 from ..items import Classes
 
 from ._base import BaseSpider
@@ -18,34 +19,22 @@ class Spider(BaseSpider):
         id = response.url.split('/')[-2]
         struct['id'] = id
 
-        name = response.xpath('//h1').xpath('string()').get().strip()
+        page = CodexPage(response)
+
+        name = page.name
         struct['name'] = name
 
-        icon = response.xpath("//div[@class='codex-page-icon']/img/@src").get()
+        icon = page.icon
         struct['icon'] = UrlParser.icon(icon)
 
-        description = response.xpath(
-            "//div[@class='codex-page-description']").xpath('string()').get().strip()
+        description = page.text('codex-page-description').strip()
         struct['description'] = description
 
-        meta = response.xpath(
-            "//div[@class='codex-page-meta']").xpath('string()').getall()
+        meta = page.texts('codex-page-meta')
         struct['meta'] = [Exctractor.extract_kv(m.strip()) for m in meta]
 
-        drops = response.xpath("//div[@class='codex-page'][1]/h4")
+        drops = Exctractor.extract_drops(page.root)
         if any(drops):
-            tmp = []
-            for drop in drops:
-                drop_name = Exctractor.extract_kv(
-                    drop.xpath('string()').get())[0].strip()
-                d = drop.xpath("./following-sibling::*[1]")
-                d_list = []
-                while any(d):
-                    if any(d.xpath('self::hr | self::h4')):
-                        break
-                    d_list.append(Exctractor.extract_drop(d))
-                    d = d.xpath("./following-sibling::*[1]")
-                tmp.append((drop_name, d_list))
-            struct['drops'] = tmp
+            struct['drops'] = drops
 
         yield Classes(struct)
@@ -5,6 +5,7 @@ from scrapy.utils.project import get_project_settings
 
 from ornacodex.items import Image
 from ornacodex.spiders._base import UrlBuilder
+from ornacodex.utils.image_store import ImageStore
 
 
 settings = get_project_settings()
@@ -15,10 +16,8 @@ class Spider(scrapy.Spider):
 
     custom_settings = {
         'ITEM_PIPELINES': {
-            'ornacodex.pipelines.IconFilesPipeline': 1,
+            'ornacodex.pipelines.IconStorePipeline': 1,
         },
-        'FILES_URLS_FIELD': 'file_urls',
-        'FILES_RESULT_FIELD': 'files',
         'HTTPCACHE_POLICY': 'scrapy.extensions.httpcache.RFC2616Policy'
     }
 
@@ -28,15 +27,32 @@ class Spider(scrapy.Spider):
         **kwargs
     ) -> None:
         super().__init__(**kwargs)
-        self.images = images
+        # each icon once, in the order given
+        self.images = list(dict.fromkeys(image for image in images if image))
 
     def start_requests(self) -> Iterable[scrapy.Request]:
-        yield scrapy.Request(UrlBuilder.base, self.parse)
+        store = ImageStore.open(self.settings.get('IMAGE_STORE'))
+        for image in self.images:
+            headers = {}
+            state = store.get(image)
+            if state is not None:
+                if state['etag']:
+                    headers['If-None-Match'] = state['etag']
+                if state['last_modified']:
+                    headers['If-Modified-Since'] = state['last_modified']
+            yield scrapy.Request(
+                UrlBuilder.icon(image),
+                self.parse,
+                headers=headers,
+                meta={'icon': image, 'handle_httpstatus_list': [304]},
+            )
 
     def parse(self, response: Response):
-        for image in self.images:
-            if image:
-                item = Image()
-                item['file_urls'] = [UrlBuilder.icon(image)]
-                item['icon'] = image
-                yield item
+        item = Image()
+        item['icon'] = response.meta['icon']
+        item['status'] = response.status
+        if response.status == 200:
+            item['body'] = response.body
+            item['etag'] = (response.headers.get('ETag') or b'').decode() or None
+            item['last_modified'] = (response.headers.get('Last-Modified') or b'').decode() or None
+        yield item
@@ -1,7 +1,7 @@
-import asyncio
 from collections.abc import Iterable
 import scrapy
 
+from twisted.python.failure import Failure
 from scrapy.http.request import Request
 from scrapy.http.response import Response
 from scrapy.utils.project import get_project_settings
@@ -9,6 +9,7 @@ from scrapy.utils.project import get_project_settings
 from ..items import ItemTypes
 from ..utils.exctractor import Exctractor
 from ..utils.url_utils import UrlBuilder
+from ._base import Pagination
 
 settings = get_project_settings()
 
@@ -27,7 +28,9 @@ class Spider(scrapy.Spider):
         self.language = language or settings.get('BASE_LANGUAGE')
         self.name_only = name_only
         self.category_url = UrlBuilder.category('items')
-        self.event = asyncio.Event()
+        # type -> listing state, in the order of the select options
+        self.types = {}
+        self.emitted = 0
 
     def start_requests(self) -> Iterable[Request]:
         yield scrapy.FormRequest(
@@ -37,42 +40,72 @@ class Spider(scrapy.Spider):
             callback=self.parse,
         )
 
-    async def parse(self, response: Response):
+    def parse(self, response: Response):
         options: scrapy.Selector = response.xpath('//select[@name="c"]/option')
-        struct = {}
         for option in options:
             value = option.attrib['value']
             if value == '':
                 continue
             name = option.xpath('string()').get().strip()
-            struct['type'] = value
-            struct['name'] = name
-            items_set = set()
-            response.meta.update({'c': value})
-            if not self.name_only:
-                yield self.parse_page(response, items_set)
-                await self.event.wait()
-                self.event.clear()
-            struct['items'] = items_set
-            yield ItemTypes(struct)
+            if self.name_only:
+                yield ItemTypes({'type': value, 'name': name, 'items': set()})
+                continue
+            listing = {
+                'type': value,
+                'name': name,
+                'items': set(),
+                'pagination': Pagination(self.settings.getint('PAGINATION_WINDOW')),
+                'pending': 0,
+            }
+            self.types[value] = listing
+        # every type and every page of a type in flight at once, counted
+        # before any of them is handed out
+        requests = [request for listing in self.types.values()
+                    for request in self.parse_page(listing, listing['pagination'].start())]
+        yield from requests
 
-    def parse_page(self, response: Response, output: set):
-        page = response.meta.get("page") or 1
-        c = response.meta.get("c")
-        return scrapy.FormRequest(
+    def parse_page(self, listing: dict, pages: Iterable[int]) -> list[scrapy.FormRequest]:
+        listing['pending'] += len(pages)
+        return [scrapy.FormRequest(
             url=self.category_url,
             method='GET',
-            formdata={'p': str(page), 'lang': self.language, 'c': c},
+            formdata={'p': str(page), 'lang': self.language, 'c': listing['type']},
             callback=self.parse_list,
-            cb_kwargs=dict(output=output),
             errback=self.parse_err,
-            meta={'page': page+1, 'c': c}
-        )
+            meta={'page': page, 'c': listing['type']}
+        ) for page in pages]
+
+    def parse_list(self, response: Response):
+        listing = self.types[response.meta['c']]
+        listing['pending'] -= 1
+        try:
+            entries = response.xpath('//div[@class="codex-entries"]/a')
+            for elem in entries:
+                listing['items'].add(Exctractor.extract_codex_id(elem.attrib['href'])[-1])
+        except Exception:
+            # a page that can't be read ends its type like an empty page, so
+            # it doesn't hold back the types after it
+            self.logger.exception(f'failed to parse {response.url}')
+            entries = []
+        requests = self.parse_page(listing, listing['pagination'].next_pages(
+            response.meta['page'], any(entries)))
+        yield from requests
+        yield from self.parse_done()
 
-    async def parse_list(self, response: Response, output: set):
-        for elem in response.xpath('//div[@class="codex-entries"]/a'):
-            output.add(Exctractor.extract_codex_id(elem.attrib['href'])[-1])
-        yield self.parse_page(response, output)
+    def parse_err(self, failure: Failure):
+        listing = self.types[failure.request.meta['c']]
+        listing['pending'] -= 1
+        listing['pagination'].stop(failure.request.meta['page'])
+        yield from self.parse_done()
 
-    async def parse_err(self, response: Response):
-        self.event.set()
+    def parse_done(self):
+        # emit finished types in option order, as the serial crawl did
+        listings = list(self.types.values())
+        while self.emitted < len(listings) and listings[self.emitted]['pending'] == 0:
+            listing = listings[self.emitted]
+            self.emitted += 1
+            yield ItemTypes({
+                'type': listing['type'],
+                'name': listing['name'],
+                'items': listing['items'],
+            })
@@ -1,6 +1,8 @@
 from scrapy.http.response import Response
 
 from ..utils.exctractor import Exctractor
+from ..utils import selectors as xp
+from ..utils.selectors import CodexPage
 from ..utils.url_utils import UrlParser
 from ..items import Items
 
@@ -18,42 +20,38 @@ class Spider(BaseSpider):
         id = response.url.split('/')[-2]
         struct['id'] = id
 
-        name = response.xpath('//h1').xpath('string()').get().strip()
+        page = CodexPage(response)
+
+        name = page.name
         struct['name'] = name
 
-        icon = response.xpath("//div[@class='codex-page-icon']/img/@src").get()
+        icon = page.icon
         struct['icon'] = UrlParser.icon(icon)
 
-        aura = response.xpath(
-            "//div[@class='codex-page-icon']/img/@class").get().strip()
+        aura = page.aura.strip()
         if any(aura):
             struct['aura'] = aura
 
-        description = response.xpath(
-            "//pre[@class='codex-page-description']").xpath('string()').get().strip()
+        description = xp.string(page.pre_descriptions[0]).strip()
         struct['description'] = description
 
-        exotic = response.xpath(
-            "//div[@class='codex-page-meta']/span[@class='exotic']").xpath('string()').get()
+        exotic = xp.get(xp.exotic, page.find('codex-page-meta'))
         if exotic is not None:
-            struct['exotic'] = exotic
+            struct['exotic'] = xp.string(exotic)
 
-        meta = response.xpath(
-            "//div[@class='codex-page-meta' and not(span[@class='exotic'])]").xpath('string()').getall()
+        meta = xp.texts([m for m in page.find('codex-page-meta') if not xp.exotic(m)])
         struct['meta'] = [Exctractor.extract_kv(m.strip()) for m in meta]
 
-        tags = response.xpath(
-            "//div[@class='codex-page-tag']").xpath('string()').getall()
+        tags = page.tags
         if any(tags):
             struct['tags'] = [s.strip()[2:] for s in tags]
 
-        stats = response.xpath(
-            "//div[@class='codex-stats']/div[contains(@class,'codex-stat')]")
-        if any(stats):
+        stats = page.stats
+        if len(stats) > 0:
             tmp = []
             for stat in stats:
-                s = stat.xpath("string()").get().strip()
-                if len(stat.xpath("@class").get().split()) > 1:
+                s = xp.string(stat).strip()
+                if len(stat.get('class').split()) > 1:
                     tmp.append(('element', [s]))
                 else:
                     if ' / ' in s:
@@ -70,27 +68,15 @@ class Spider(BaseSpider):
                                    for i in Exctractor.extract_kv(s)))
             struct['stats'] = tmp
 
-        ability = response.xpath(
-            "//div[@class='codex-page-description']/preceding-sibling::div[1] | //div[@class='codex-page-description']").xpath("string()").getall()
+        ability = xp.texts(xp.item_ability(page.root))
         if len(ability) == 2:
             struct['ability'] = (
                 Exctractor.extract_kv(ability[0])[-1].strip(),
                 ability[1].strip()
             )
 
-        drops = response.xpath("//div[@class='codex-page'][1]/h4")
+        drops = Exctractor.extract_drops(page.root)
         if any(drops):
-            tmp = []
-            for drop in drops:
-                drop_name = Exctractor.extract_kv(drop.xpath('string()').get())[0].strip()
-                d = drop.xpath("./following-sibling::*[1]")
-                d_list = []
-                while any(d):
-                    if any(d.xpath('self::hr | self::h4')):
-                        break
-                    d_list.append(Exctractor.extract_drop(d))
-                    d = d.xpath("./following-sibling::*[1]")
-                tmp.append((drop_name, d_list))
-            struct['drops'] = tmp
+            struct['drops'] = drops
 
         yield Items(struct)
@@ -1,6 +1,8 @@
 from scrapy.http.response import Response
 
 from ..utils.exctractor import Exctractor
+from ..utils import selectors as xp
+from ..utils.selectors import CodexPage
 from ..utils.url_utils import UrlParser
 from ..items import Spells
 
@@ -18,45 +20,31 @@ class Spider(BaseSpider):
         id = response.url.split('/')[-2]
         struct['id'] = id
 
-        name = response.xpath('//h1').xpath('string()').get().strip()
+        page = CodexPage(response)
+
+        name = page.name
         struct['name'] = name
 
-        icon = response.xpath("//div[@class='codex-page-icon']/img/@src").get()
+        icon = page.icon
         struct['icon'] = UrlParser.icon(icon)
 
-        description = response.xpath(
-            "//div[@class='codex-page-description']").xpath('string()').get().strip()
+        description = page.text('codex-page-description').strip()
         struct['description'] = description
 
-        meta = response.xpath(
-            "//div[@class='codex-page-meta']").xpath('string()').getall()
+        meta = page.texts('codex-page-meta')
         struct['tier'], struct['spell_type'] = meta[0].strip().strip('★').split()
         struct['stats'] = [Exctractor.extract_kv(m.strip()) for m in meta[1:]]
 
-        element = response.xpath(
-            "//div[contains(@class,'codex-stat')]").xpath('string()').get()
+        element = next((xp.string(e) for cls, e in page.divs if 'codex-stat' in cls), None)
         if element:
             struct['stats'].append(('element', [s.strip() for s in Exctractor.extract_kv(element)[-1].split(',')]))
 
-        tags = response.xpath(
-            "//div[@class='codex-page-tag']").xpath('string()').getall()
+        tags = page.tags
         if any(tags):
             struct['tags'] = [s.strip()[2:] for s in tags]
 
-        drops = response.xpath("//div[@class='codex-page'][1]/h4")
+        drops = Exctractor.extract_drops(page.root)
         if any(drops):
-            tmp = []
-            for drop in drops:
-                drop_name = Exctractor.extract_kv(
-                    drop.xpath('string()').get())[0].strip()
-                d = drop.xpath("./following-sibling::*[1]")
-                d_list = []
-                while any(d):
-                    if any(d.xpath('self::hr | self::h4')):
-                        break
-                    d_list.append(Exctractor.extract_drop(d))
-                    d = d.xpath("./following-sibling::*[1]")
-                tmp.append((drop_name, d_list))
-            struct['drops'] = tmp
+            struct['drops'] = drops
 
         yield Spells(struct)
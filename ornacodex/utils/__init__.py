@@ -1,4 +1,5 @@
 import hashlib
+from itertools import accumulate
 
 
 def get_entry_key(ent: dict):
@@ -6,4 +7,13 @@ def get_entry_key(ent: dict):
 
 
 def get_hash(content: str):
-    return hashlib.md5(content.encode('utf-8')).hexdigest()[:8]
\ No newline at end of file
+    return hashlib.md5(content.encode('utf-8')).hexdigest()[:8]
+
+
+def delta_encode(numbers: list[int]) -> list[int]:
+    # the first number, then the difference to the one before
+    return [n - prev for prev, n in zip([0, *numbers], numbers)]
+
+
+def delta_decode(deltas: list[int]) -> list[int]:
+    return list(accumulate(deltas))
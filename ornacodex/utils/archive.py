@@ -0,0 +1,92 @@
+from collections.abc import Iterator
+from pathlib import Path
+import sqlite3
+import zlib
+
+
+class ResponseArchive:
+    # raw codex responses of the last download (category listing and entry
+    # pages), kept so the spiders can parse them again without the network
+
+    _opened: dict[Path, 'ResponseArchive'] = {}
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                language TEXT NOT NULL,
+                category TEXT NOT NULL,
+                response_url TEXT NOT NULL,
+                encoding TEXT NOT NULL,
+                body BLOB NOT NULL,
+                run INTEGER NOT NULL
+            )
+        ''')
+        self.run = self.db.execute(
+            'SELECT COALESCE(MAX(run), 0) + 1 FROM responses').fetchone()[0]
+        self.pending = 0
+
+    @classmethod
+    def open(cls, path: str | Path) -> 'ResponseArchive':
+        path = Path(path).resolve()
+        if path not in cls._opened:
+            cls._opened[path] = cls(path)
+        return cls._opened[path]
+
+    def has(self, url: str) -> bool:
+        return self.db.execute(
+            'SELECT 1 FROM responses WHERE url = ?', (url,)).fetchone() is not None
+
+    def save(self, url: str, kind: str, language: str, category: str,
+             response_url: str, encoding: str, body: bytes):
+        self.db.execute('''
+            INSERT OR REPLACE INTO responses
+            (url, kind, language, category, response_url, encoding, body, run)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (url, kind, language, category, response_url, encoding,
+              zlib.compress(body), self.run))
+        self.flush()
+
+    def touch(self, url: str):
+        self.db.execute('UPDATE responses SET run = ? WHERE url = ?', (self.run, url))
+        self.flush()
+
+    def flush(self, force: bool = False):
+        self.pending += 1
+        if force or self.pending >= 500:
+            self.db.commit()
+            self.pending = 0
+
+    def prune(self, languages: list[str], categories: list[str]) -> int:
+        # responses of the crawled languages not seen in this run are gone
+        # from the codex
+        removed = self.db.execute(
+            f'''DELETE FROM responses WHERE run != ?
+                AND language IN ({','.join('?' * len(languages))})
+                AND category IN ({','.join('?' * len(categories))})''',
+            (self.run, *languages, *categories)).rowcount
+        self.flush(force=True)
+        return removed
+
+    def groups(self) -> list[tuple[str, str]]:
+        return self.db.execute(
+            'SELECT DISTINCT language, category FROM responses ORDER BY language, category').fetchall()
+
+    def iter(self, language: str, category: str, kind: str) -> Iterator[tuple[str, str, bytes]]:
+        # (response url, encoding, body)
+        rows = self.db.execute('''
+            SELECT response_url, encoding, body FROM responses
+            WHERE language = ? AND category = ? AND kind = ? ORDER BY url
+        ''', (language, category, kind))
+        for response_url, encoding, body in rows:
+            yield response_url, encoding, zlib.decompress(body)
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+        self._opened.pop(self.path.resolve(), None)
@@ -0,0 +1,103 @@
+from contextlib import ExitStack
+import hashlib
+import json
+from pathlib import Path
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def iter_json(content, encoder: json.JSONEncoder, depth: int = 2):
+    # json text in pieces: the outer `depth` levels of dicts / lists are
+    # walked here, what is inside them goes through the (C) one shot encoder,
+    # joined the way json.dumps does with the default separators
+    if (depth == 0 or not isinstance(content, (dict, list)) or not content
+            or isinstance(content, dict) and not all(isinstance(k, str) for k in content)):
+        yield encoder.encode(content)
+    elif isinstance(content, dict):
+        for i, (key, value) in enumerate(content.items()):
+            yield ('{' if i == 0 else ', ') + encoder.encode(key) + ': '
+            yield from iter_json(value, encoder, depth - 1)
+        yield '}'
+    else:
+        for i, value in enumerate(content):
+            yield '[' if i == 0 else ', '
+            yield from iter_json(value, encoder, depth - 1)
+        yield ']'
+
+
+class ArtifactWriter:
+    # streams json into `<name>.<hash>.json` under `root`, hashing while it
+    # writes instead of building the whole string first, with precompressed
+    # `.gz` (and `.br` when brotli is installed) siblings for the static host
+
+    # bytes encoded before they are hashed, written and compressed
+    chunk_size = 1 << 16
+
+    def __init__(self, root: Path, precompress: bool = True):
+        self.root = root
+        self.precompress = precompress
+        # path from `root` -> sizes of the file and its siblings
+        self.artifacts: dict[str, dict[str, int]] = {}
+
+    def write_json(self, name: str, content, base: str | None = None) -> str:
+        # `name` and the returned file name are relative to `root/base`
+        output_dir = self.root.joinpath(base) if base else self.root
+        tmp_path = output_dir.joinpath(f'{name}.tmp')
+        tmp_path.parent.mkdir(parents=True, exist_ok=True)
+
+        md5 = hashlib.md5()
+        # gzip container, mtime 0 so same content gives the same bytes
+        gz = zlib.compressobj(9, zlib.DEFLATED, 31) if self.precompress else None
+        br = brotli.Compressor() if self.precompress and brotli is not None else None
+        # compressed siblings are streamed next to the tmp file as well
+        siblings = {suffix: tmp_path.with_name(tmp_path.name + suffix)
+                    for suffix, compressor in (('.gz', gz), ('.br', br)) if compressor is not None}
+        size = 0
+
+        with ExitStack() as stack:
+            f = stack.enter_context(open(tmp_path, 'wb'))
+            gz_file = stack.enter_context(open(siblings['.gz'], 'wb')) if gz is not None else None
+            br_file = stack.enter_context(open(siblings['.br'], 'wb')) if br is not None else None
+
+            def flush(chunks: list[str]):
+                nonlocal size
+                data = ''.join(chunks).encode('utf-8')
+                size += len(data)
+                md5.update(data)
+                f.write(data)
+                if gz is not None:
+                    gz_file.write(gz.compress(data))
+                if br is not None:
+                    br_file.write(br.process(data))
+
+            chunks, pending = [], 0
+            for chunk in iter_json(content, json.JSONEncoder(ensure_ascii=False)):
+                chunks.append(chunk)
+                pending += len(chunk)
+                if pending >= self.chunk_size:
+                    flush(chunks)
+                    chunks, pending = [], 0
+            flush(chunks)
+            if gz is not None:
+                gz_file.write(gz.flush())
+            if br is not None:
+                br_file.write(br.finish())
+
+        # same name as utils.get_hash of the json string
+        file_name = f'{name}.{md5.hexdigest()[:8]}.json'
+        file_path = output_dir.joinpath(file_name)
+        tmp_path.replace(file_path)
+        sizes = {'size': size}
+        for suffix, key in (('.gz', 'gzip'), ('.br', 'br')):
+            if suffix in siblings:
+                sizes[key] = siblings[suffix].stat().st_size
+                siblings[suffix].replace(file_path.with_name(file_path.name + suffix))
+
+        path = file_path.relative_to(self.root).as_posix()
+        self.artifacts[path] = sizes
+        print('save file:', path)
+        return file_name
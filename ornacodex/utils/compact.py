@@ -0,0 +1,164 @@
+from collections import Counter
+from functools import reduce
+import json
+from pathlib import Path
+
+from . import get_entry_key
+
+
+# compact codex (`codex.compact.<hash>.json`):
+#   strings: every string of the entries once, the most used first
+#   keys:    `category/id` of entry n, entry numbers replace the keys the
+#            entries point to (skills, drops, used_by, ...)
+#   fields:  [name, shape] of the entry fields besides category and id
+#   entries: [field, value, field, value, ...] per entry
+#   meta:    as in the codex
+#
+# a shape tells how a value is stored, found over all values of the field:
+#   's'  string -> index in strings
+#   'r'  entry key -> entry number
+#   'v'  as it is (numbers, flags, values of mixed types)
+#   {'list': shape}          list of values of that shape
+#   {'dict': {key: shape}}   [key string, value, key string, value, ...]
+#   None                     nothing seen (only empty lists)
+
+FORMAT = 1
+
+
+def infer_shape(value, keys: dict):
+    if isinstance(value, str):
+        return 'r' if value in keys else 's'
+    if isinstance(value, list):
+        return {'list': reduce(merge_shapes, (infer_shape(v, keys) for v in value), None)}
+    if isinstance(value, dict):
+        return {'dict': {k: infer_shape(v, keys) for k, v in value.items()}}
+    return 'v'
+
+
+def merge_shapes(a, b):
+    if a is None or a == b:
+        return b
+    if b is None:
+        return a
+    if a in ('s', 'r') and b in ('s', 'r'):
+        # some strings are not entry keys
+        return 's'
+    if isinstance(a, dict) and isinstance(b, dict) and a.keys() == b.keys():
+        if 'list' in a:
+            return {'list': merge_shapes(a['list'], b['list'])}
+        return {'dict': {k: merge_shapes(a['dict'].get(k), b['dict'].get(k))
+                         for k in a['dict'].keys() | b['dict'].keys()}}
+    return 'v'
+
+
+def encode_value(value, shape, intern, refs: dict):
+    if shape == 's':
+        return intern(value)
+    if shape == 'r':
+        return refs[value]
+    if isinstance(shape, dict) and 'list' in shape:
+        return [encode_value(v, shape['list'], intern, refs) for v in value]
+    if isinstance(shape, dict):
+        return [x for k, v in value.items()
+                for x in (intern(k), encode_value(v, shape['dict'][k], intern, refs))]
+    return value
+
+
+def decode_value(value, shape, strings: list, keys: list):
+    if shape == 's':
+        return strings[value]
+    if shape == 'r':
+        return keys[value]
+    if isinstance(shape, dict) and 'list' in shape:
+        return [decode_value(v, shape['list'], strings, keys) for v in value]
+    if isinstance(shape, dict):
+        dict_shape = shape['dict']
+        return {
+            strings[value[i]]: decode_value(value[i + 1], dict_shape[strings[value[i]]],
+                                            strings, keys)
+            for i in range(0, len(value), 2)
+        }
+    return value
+
+
+def encode_codex(codex: dict) -> dict:
+    entries = codex['entries']
+    keys = {get_entry_key(entry): n for n, entry in enumerate(entries)}
+
+    shapes = {}
+    for entry in entries:
+        for field, value in entry.items():
+            if field not in ('category', 'id'):
+                shapes[field] = merge_shapes(shapes.get(field), infer_shape(value, keys))
+    fields = {field: n for n, field in enumerate(shapes)}
+
+    def encode_entries(intern):
+        return [
+            [x for field, value in entry.items() if field not in ('category', 'id')
+             for x in (fields[field], encode_value(value, shapes[field], intern, keys))]
+            for entry in entries
+        ]
+
+    # counted first, so the most used strings get the shortest indices
+    counts = Counter()
+    encode_entries(lambda s: counts.update((s,)))
+    strings = sorted(counts, key=lambda s: -counts[s])
+    index = {s: n for n, s in enumerate(strings)}
+
+    return {
+        'format': FORMAT,
+        'strings': strings,
+        'keys': list(keys),
+        'fields': [[field, shape] for field, shape in shapes.items()],
+        'entries': encode_entries(index.__getitem__),
+        'meta': codex['meta'],
+    }
+
+
+class CompactCodex:
+    # the entries of a compact codex as in the codex, decoded when asked for
+
+    def __init__(self, data: dict):
+        if data.get('format') != FORMAT:
+            raise ValueError(f'unknown compact codex format: {data.get("format")}')
+        self.strings = data['strings']
+        self.keys = data['keys']
+        self.fields = data['fields']
+        self.records = data['entries']
+        self.meta = data['meta']
+        self._index = None
+
+    @classmethod
+    def load(cls, file_path: str | Path) -> 'CompactCodex':
+        with open(file_path) as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __iter__(self):
+        return (self.entry(n) for n in range(len(self.keys)))
+
+    def index(self, key: str) -> int:
+        # entry number of `category/id`
+        if self._index is None:
+            self._index = {key: n for n, key in enumerate(self.keys)}
+        return self._index[key]
+
+    def entry(self, n: int) -> dict:
+        category, id = self.keys[n].split('/', 1)
+        entry = {'category': category, 'id': id}
+        record = self.records[n]
+        for i in range(0, len(record), 2):
+            field, shape = self.fields[record[i]]
+            entry[field] = decode_value(record[i + 1], shape, self.strings, self.keys)
+        return entry
+
+    def get(self, key: str) -> dict | None:
+        try:
+            return self.entry(self.index(key))
+        except KeyError:
+            return None
+
+    def to_codex(self) -> dict:
+        return {'entries': list(self), 'meta': self.meta}
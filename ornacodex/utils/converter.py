@@ -1,4 +1,3 @@
-from collections import defaultdict
 from functools import cache
 import hashlib
 import re
@@ -19,18 +18,48 @@ class Converter:
 class UniqueKeyGenerator:
 
     def __init__(self):
-        self.name_counter = defaultdict(int)
+        # keys given out in this run
+        self.used_keys = set()
         self.seen_combinations = dict()
+        # identifier -> key of an earlier run (load)
+        self.registered = dict()
+
+    def load(self, registry: list[list]):
+        # [*identifier, unique_key] rows of an earlier run, kept by
+        # assign() for the identifiers still around
+        for *identifier, unique_key in registry:
+            self.registered.setdefault(tuple(identifier), unique_key)
+
+    def dump(self) -> list[list]:
+        # only what this run saw, identifiers gone are dropped
+        return [[*identifier, unique_key]
+                for identifier, unique_key in self.seen_combinations.items()]
+
+    def assign(self, identifiers: list[tuple[str, str]]):
+        # all identifiers of a run: the registered ones keep their key, then
+        # the others get one in order, the bare key once nobody holds it
+        for identifier in identifiers:
+            unique_key = self.registered.get(identifier)
+            if (unique_key is not None and identifier not in self.seen_combinations
+                    and unique_key not in self.used_keys):
+                self.seen_combinations[identifier] = unique_key
+                self.used_keys.add(unique_key)
+        for identifier in identifiers:
+            self.generate_unique_key(identifier)
+
+    def get_unique_key(self, identifier: tuple[str, str]):
+        # the key generate_unique_key() gave out, never a new one
+        return self.seen_combinations[identifier]
 
     def generate_unique_key(self, identifier: tuple[str, str]):
         key = Converter.convert_key(identifier[0])
         if identifier in self.seen_combinations:
             return self.seen_combinations[identifier]
-        if self.name_counter[key] == 0:
+        if key not in self.used_keys:
             unique_key = key
         else:
             hash_suffix = hashlib.md5(identifier[1].encode()).hexdigest()[:8]
             unique_key = f'{key}_{hash_suffix}'
         self.seen_combinations[identifier] = unique_key
-        self.name_counter[key] += 1
+        self.used_keys.add(unique_key)
         return unique_key
@@ -0,0 +1,124 @@
+from . import get_entry_key
+
+
+# every diff is one pass over the keys of both sides, values are compared
+# as they are
+
+
+def diff_keys(old: dict, new: dict) -> dict:
+    # {'set': {key: new value}, 'unset': [removed key]}
+    delta = {}
+    changed = {key: value for key, value in new.items()
+               if key not in old or old[key] != value}
+    if any(changed):
+        delta['set'] = changed
+    removed = [key for key in old if key not in new]
+    if any(removed):
+        delta['unset'] = removed
+    return delta
+
+
+def diff_groups(old: dict, new: dict) -> dict:
+    # diff_keys of each group of `{group: {key: value}}` (meta, msg)
+    delta = {}
+    for group in new.keys() | old.keys():
+        group_delta = diff_keys(old.get(group, {}), new.get(group, {}))
+        if any(group_delta):
+            delta[group] = group_delta
+    return dict(sorted(delta.items()))
+
+
+def diff_records(old: dict, new: dict) -> dict:
+    # keyed records: whole added ones, keys of removed ones and the fields
+    # set / unset on changed ones; the records are numbered by position
+    # (filters, orders, search, compact), so the new order goes along:
+    # `positions` of the added records in the new list, or the whole `order`
+    # of keys when kept records moved
+    delta = {}
+    added = {key: record for key, record in new.items() if key not in old}
+    if any(added):
+        delta['added'] = added
+    removed = [key for key in old if key not in new]
+    if any(removed):
+        delta['removed'] = removed
+    if [key for key in new if key in old] != [key for key in old if key in new]:
+        delta['order'] = list(new)
+    elif any(added):
+        positions = [n for n, key in enumerate(new) if key in added]
+        if positions[0] != len(new) - len(added):
+            delta['positions'] = positions
+    changed = {key: diff_keys(old[key], record) for key, record in new.items()
+               if key in old and old[key] != record}
+    if any(changed):
+        delta['changed'] = changed
+    return delta
+
+
+def codex_delta(old: dict, new: dict) -> dict:
+    return {
+        'entries': diff_records(
+            {get_entry_key(e): e for e in old['entries']},
+            {get_entry_key(e): e for e in new['entries']}),
+        'meta': diff_groups(old['meta'], new['meta']),
+    }
+
+
+def locale_delta(old: dict, new: dict) -> dict:
+    return {
+        'msg': diff_groups(old['msg'], new['msg']),
+        'entries': diff_records(
+            {get_entry_key(e): e for e in old['entries']},
+            {get_entry_key(e): e for e in new['entries']}),
+        'abilities': diff_records(
+            {a['id']: a for a in old['abilities']},
+            {a['id']: a for a in new['abilities']}),
+    }
+
+
+def apply_keys(target: dict, delta: dict) -> dict:
+    unset = set(delta.get('unset', []))
+    target = {key: value for key, value in target.items() if key not in unset}
+    target.update(delta.get('set', {}))
+    return target
+
+
+def apply_groups(target: dict, delta: dict) -> dict:
+    target = dict(target)
+    for group, group_delta in delta.items():
+        target[group] = apply_keys(target.get(group, {}), group_delta)
+    return target
+
+
+def apply_records(records: list[dict], delta: dict, key=get_entry_key) -> list[dict]:
+    removed = set(delta.get('removed', []))
+    changed = delta.get('changed', {})
+    records = [
+        apply_keys(record, changed[key(record)]) if key(record) in changed else record
+        for record in records if key(record) not in removed
+    ]
+    added = delta.get('added', {})
+    if 'order' in delta:
+        by_key = {key(record): record for record in records}
+        by_key.update(added)
+        return [by_key[k] for k in delta['order']]
+    if 'positions' in delta:
+        # ascending, each added record lands at its final position
+        for n, record in zip(delta['positions'], added.values()):
+            records.insert(n, record)
+        return records
+    return [*records, *added.values()]
+
+
+def apply_codex_delta(codex: dict, delta: dict) -> dict:
+    return {
+        'entries': apply_records(codex['entries'], delta['entries']),
+        'meta': apply_groups(codex['meta'], delta['meta']),
+    }
+
+
+def apply_locale_delta(locale: dict, delta: dict) -> dict:
+    return {
+        'msg': apply_groups(locale['msg'], delta['msg']),
+        'entries': apply_records(locale['entries'], delta['entries']),
+        'abilities': apply_records(locale['abilities'], delta['abilities'], key=lambda a: a['id']),
+    }
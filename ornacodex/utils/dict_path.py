@@ -0,0 +1,63 @@
+from functools import cache
+from typing import Any
+
+
+# errors of a missing key / index / attribute, what glom reports as PathAccessError
+access_errors = (LookupError, TypeError, ValueError, AttributeError)
+
+_required = object()
+
+
+class DictPath:
+    # glom style dotted paths ('items/sword.stats.0.1') without glom:
+    # paths are split once and walked with plain item access
+
+    @classmethod
+    @cache
+    def split(cls, path: str) -> tuple[str, ...]:
+        return tuple(path.split('.'))
+
+    @classmethod
+    def segments(cls, path: str | tuple) -> tuple:
+        # tuple paths are already split, their indexes may be ints
+        return path if isinstance(path, tuple) else cls.split(path)
+
+    @staticmethod
+    def get_item(target: Any, segment: str | int) -> Any:
+        # same lookup as glom's default target registry
+        if isinstance(target, dict):
+            return target[segment]
+        if isinstance(target, (list, tuple)):
+            return target[int(segment)]
+        return getattr(target, segment)
+
+    @staticmethod
+    def set_item(target: Any, segment: str | int, value: Any):
+        if isinstance(target, dict):
+            target[segment] = value
+        elif isinstance(target, list):
+            target[int(segment)] = value
+        else:
+            setattr(target, segment, value)
+
+    @classmethod
+    def get(cls, target: Any, path: str | tuple, default: Any = _required) -> Any:
+        # glom.glom(target, path), or glom.Coalesce(path, default=default)
+        try:
+            for segment in cls.segments(path):
+                target = cls.get_item(target, segment)
+        except access_errors:
+            if default is _required:
+                raise
+            return default
+        return target
+
+    @classmethod
+    def assign(cls, target: Any, path: str | tuple, value: Any) -> Any:
+        # glom.assign(target, path, value), parents must exist
+        *parents, last = cls.segments(path)
+        parent = target
+        for segment in parents:
+            parent = cls.get_item(parent, segment)
+        cls.set_item(parent, last, value)
+        return target
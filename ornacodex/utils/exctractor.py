@@ -1,8 +1,8 @@
 import ast
 import re
+from urllib.parse import parse_qs, urlparse
 
-from scrapy.selector.unified import SelectorList
-
+from . import selectors as xp
 from .url_utils import UrlParser
 
 split_pattern = re.compile(r':|：')
@@ -30,29 +30,28 @@ class Exctractor:
         return s, None
 
     @classmethod
-    def extract_drop(cls, drop):
+    def extract_drop(cls, drop) -> dict:
         drop_struct = {}
         # bestial bonds
-        bond = drop.xpath('./span[@class="emph"]')
-        if any(bond):
-            drop_struct['name'] = split_pattern.split(
-                bond.xpath('string()').get())[0]
+        bond = xp.bond(drop)
+        if len(bond) > 0:
+            drop_struct['name'] = split_pattern.split(xp.string(bond[0]))[0]
             drop_struct['stats'] = ''.join(
-                bond.xpath('../text()').getall()).strip()
+                text for b in bond for text in xp.parent_text_nodes(b)).strip()
             return drop_struct
         # passive ability
-        ability = drop.xpath('./self::div[@class="spaced"]')
-        if any(ability):
-            name = drop.xpath('.//span').xpath('string()').get().strip()
+        ability = xp.spaced(drop)
+        if len(ability) > 0:
+            name = xp.string(xp.spans(drop)[0]).strip()
             drop_struct['name'] = name
-            description = drop.xpath('./div[@class="emph"]').xpath('string()')
+            description = xp.texts(xp.emph(drop))
             if any(description):
-                drop_struct['description'] = description.get().strip()
-            stats = drop.xpath('.//div[@class="codex-stats"]')
-            if any(stats):
+                drop_struct['description'] = description[0].strip()
+            stats = xp.codex_stats(drop)
+            if len(stats) > 0:
                 stats_list = []
-                for s in stats.xpath('./div[@class="codex-stat"]'):
-                    stat = s.xpath('string()').get()
+                for s in (s for stat in stats for s in xp.codex_stat(stat)):
+                    stat = xp.string(s)
                     if ' / ' in stat:
                         for ss in stat.split('/'):
                             stats_list.append(
@@ -61,31 +60,56 @@ class Exctractor:
                         stats_list.append(Exctractor.extract_kv(stat))
                 if any(stats_list):
                     drop_struct['stats'] = stats_list
-            icon = ability.xpath('.//img/@src').get()
+            icon = xp.get(xp.img_src, ability)
             if icon:
                 drop_struct['icon'] = UrlParser.icon(icon)
             return drop_struct
         # else
-        name = drop.xpath('.//span').xpath('string()').get().strip()
+        name = xp.string(xp.spans(drop)[0]).strip()
         name, chance = cls.extract_chance(name)
         if chance:
             drop_struct['chance'] = chance
         drop_struct['name'] = name
-        icon = drop.xpath('.//img/@src').get()
+        icon = xp.get(xp.img_src, [drop])
         if icon:
             drop_struct['icon'] = UrlParser.icon(icon)
-        href = drop.xpath('.//a/@href').get()
+        href = xp.get(xp.a_href, [drop])
         if href:
             drop_struct['href'] = href
-        description = drop.xpath('./div[@class="emph"]').xpath('string()')
+        description = xp.texts(xp.emph(drop))
         if any(description):
-            drop_struct['description'] = description.get().strip()
+            drop_struct['description'] = description[0].strip()
         return drop_struct
 
+    @classmethod
+    def extract_drops(cls, root) -> list[tuple[str, list]]:
+        # sections of the codex page: an <h4> followed by its drops up to
+        # the next <h4> or <hr>, the children are walked once
+        drops = []
+        for codex_page in xp.codex_pages(root):
+            d_list = None
+            for child in xp.children(codex_page):
+                tag = child.tag
+                if tag == 'h4':
+                    drop_name = cls.extract_kv(xp.string(child))[0].strip()
+                    d_list = []
+                    drops.append((drop_name, d_list))
+                elif tag == 'hr':
+                    d_list = None
+                elif d_list is not None:
+                    d_list.append(cls.extract_drop(child))
+        return drops
+
     @classmethod
     def extract_codex_id(cls, codex: str) -> list[str]:
         return codex.strip('/').split('/')[-2:]
 
+    @classmethod
+    def extract_page_count(cls, hrefs: list[str]) -> int | None:
+        pages = [int(p) for href in hrefs
+                 for p in parse_qs(urlparse(href).query).get('p', []) if p.isdigit()]
+        return max(pages, default=None)
+
     @classmethod
     def extract_codex_key(cls, codex: str) -> list[str]:
         return codex.strip('/')[6:]
@@ -127,11 +151,11 @@ class Exctractor:
         return bb
 
     @classmethod
-    def extract_follower(cls, follower: SelectorList) -> list:
-        k: str = split_pattern.split(follower.xpath(
-            './text()').get(), maxsplit=1)[0].strip()
-        name = follower.xpath('.//span').xpath('string()').get().strip()
-        icon = follower.xpath('.//img/@src').get()
+    def extract_follower(cls, follower: list) -> list:
+        k: str = split_pattern.split(xp.get(
+            xp.text_nodes, follower), maxsplit=1)[0].strip()
+        name = xp.string(xp.get(xp.spans, follower)).strip()
+        icon = xp.get(xp.img_src, follower)
         if icon:
             icon = UrlParser.icon(icon)
         return [k, {'name': name, 'icon': icon}]
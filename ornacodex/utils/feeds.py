@@ -0,0 +1,39 @@
+from collections.abc import Iterator
+import json
+from pathlib import Path
+import shutil
+
+
+# scrapy feed format -> file suffix
+feed_suffixes = {
+    'json': '.json',
+    'jsonlines': '.jsonl',
+}
+
+
+def feed_suffix(feed_format: str) -> str:
+    return feed_suffixes[feed_format]
+
+
+def find_feed(path: Path) -> Path | None:
+    # `path` without suffix, whichever format was written
+    for suffix in feed_suffixes.values():
+        file_path = path.with_name(path.name + suffix)
+        if file_path.exists():
+            return file_path
+    return None
+
+
+def iter_feed(file_path: Path) -> Iterator[dict]:
+    with open(file_path) as f:
+        if file_path.suffix == feed_suffixes['jsonlines']:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+
+def append_feed_file(file_path: Path, other: Path):
+    with open(other, 'rb') as src, open(file_path, 'ab') as dst:
+        shutil.copyfileobj(src, dst)
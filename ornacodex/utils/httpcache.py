@@ -0,0 +1,198 @@
+import gzip
+from pathlib import Path
+import pickle
+import sqlite3
+from time import time
+import zlib
+
+from scrapy.http import Headers
+from scrapy.http.request import Request
+from scrapy.http.response import Response
+from scrapy.responsetypes import responsetypes
+from scrapy.settings import BaseSettings
+from scrapy.spiders import Spider
+from scrapy.utils.project import data_path
+from w3lib.http import headers_dict_to_raw, headers_raw_to_dict
+
+# fingerprint, response url, status, headers (zlib), body (zlib), time
+Row = tuple[str, str, int, bytes, bytes, float]
+
+
+class CacheDatabase:
+    # the cached responses of one category in a single sqlite file, shared
+    # by the crawlers of every language
+
+    _opened: dict[Path, 'CacheDatabase'] = {}
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                fingerprint TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers BLOB NOT NULL,
+                body BLOB NOT NULL,
+                time REAL NOT NULL
+            )
+        ''')
+        self.users = 0
+        self.pending = 0
+
+    @classmethod
+    def open(cls, path: str | Path) -> 'CacheDatabase':
+        path = Path(path).resolve()
+        if path not in cls._opened:
+            cls._opened[path] = cls(path)
+        cls._opened[path].users += 1
+        return cls._opened[path]
+
+    def get(self, fingerprint: str) -> Row | None:
+        return self.db.execute(
+            'SELECT fingerprint, url, status, headers, body, time FROM responses WHERE fingerprint = ?',
+            (fingerprint,)).fetchone()
+
+    def put(self, rows: list[Row]):
+        self.db.executemany(
+            'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)', rows)
+        self.flush(len(rows))
+
+    def flush(self, n: int = 1, force: bool = False):
+        self.pending += n
+        if force or self.pending >= 500:
+            self.db.commit()
+            self.pending = 0
+
+    def close(self):
+        self.users -= 1
+        self.db.commit()
+        if self.users <= 0:
+            self.db.close()
+            self._opened.pop(self.path.resolve(), None)
+
+
+class SqliteCacheStorage:
+    # HTTPCACHE_STORAGE keeping `<HTTPCACHE_DIR>/<spider>.sqlite` with zlib
+    # compressed headers and bodies, looked up by request fingerprint
+
+    def __init__(self, settings: BaseSettings):
+        self.cachedir = Path(data_path(settings['HTTPCACHE_DIR'], createdir=True))
+        self.expiration_secs = settings.getint('HTTPCACHE_EXPIRATION_SECS')
+        self.db: CacheDatabase | None = None
+
+    def open_spider(self, spider: Spider):
+        self.db = CacheDatabase.open(self.cachedir.joinpath(f'{spider.name}.sqlite'))
+        self._fingerprinter = spider.crawler.request_fingerprinter
+
+    def close_spider(self, spider: Spider):
+        self.db.close()
+
+    def retrieve_response(self, spider: Spider, request: Request) -> Response | None:
+        row = self.db.get(self._fingerprinter.fingerprint(request).hex())
+        if row is None:
+            return None
+        _, url, status, headers, body, ts = row
+        if 0 < self.expiration_secs < time() - ts:
+            return None
+        headers = Headers(headers_raw_to_dict(zlib.decompress(headers)))
+        body = zlib.decompress(body)
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+        return respcls(url=url, headers=headers, status=status, body=body)
+
+    def store_response(self, spider: Spider, request: Request, response: Response):
+        self.db.put([(
+            self._fingerprinter.fingerprint(request).hex(),
+            response.url,
+            response.status,
+            zlib.compress(headers_dict_to_raw(response.headers)),
+            zlib.compress(response.body),
+            time(),
+        )])
+
+
+# every category of a cache dir in one file, to save / restore at once
+bundle_schema = '''
+    CREATE TABLE IF NOT EXISTS responses (
+        category TEXT NOT NULL,
+        fingerprint TEXT NOT NULL,
+        url TEXT NOT NULL,
+        status INTEGER NOT NULL,
+        headers BLOB NOT NULL,
+        body BLOB NOT NULL,
+        time REAL NOT NULL,
+        PRIMARY KEY (category, fingerprint)
+    )
+'''
+
+
+def export_cache(cachedir: Path, file_path: Path) -> dict[str, int]:
+    # rows are copied as stored, nothing is decompressed
+    file_path.unlink(missing_ok=True)
+    bundle = sqlite3.connect(file_path)
+    bundle.execute(bundle_schema)
+    counts = {}
+    for db_path in sorted(cachedir.glob('*.sqlite')):
+        bundle.execute('ATTACH DATABASE ? AS src', (str(db_path),))
+        counts[db_path.stem] = bundle.execute(
+            'INSERT INTO responses SELECT ?, * FROM src.responses', (db_path.stem,)).rowcount
+        bundle.commit()
+        bundle.execute('DETACH DATABASE src')
+    bundle.close()
+    return counts
+
+
+def import_cache(file_path: Path, cachedir: Path) -> dict[str, int]:
+    bundle = sqlite3.connect(file_path)
+    categories = [c for c, in bundle.execute('SELECT DISTINCT category FROM responses')]
+    bundle.close()
+    counts = {}
+    for category in categories:
+        db = CacheDatabase.open(cachedir.joinpath(f'{category}.sqlite'))
+        db.db.execute('ATTACH DATABASE ? AS bundle', (str(file_path),))
+        counts[category] = db.db.execute('''
+            INSERT OR REPLACE INTO responses
+            SELECT fingerprint, url, status, headers, body, time
+            FROM bundle.responses WHERE category = ?
+        ''', (category,)).rowcount
+        db.db.commit()
+        db.db.execute('DETACH DATABASE bundle')
+        db.close()
+    return counts
+
+
+def import_filesystem_cache(fs_cachedir: Path, cachedir: Path) -> dict[str, int]:
+    # a FilesystemCacheStorage dir: <spider>/<fp[:2]>/<fp>/{pickled_meta,
+    # response_headers, response_body}, all gzipped with HTTPCACHE_GZIP
+    counts = {}
+    for category_dir in sorted(p for p in fs_cachedir.iterdir() if p.is_dir()):
+        db = CacheDatabase.open(cachedir.joinpath(f'{category_dir.name}.sqlite'))
+        rows = []
+        for meta_path in category_dir.glob('*/*/pickled_meta'):
+            request_dir = meta_path.parent
+            meta = meta_path.read_bytes()
+            # a pickle never starts with the gzip magic
+            gzipped = meta[:2] == b'\x1f\x8b'
+
+            def read(name: str) -> bytes:
+                data = request_dir.joinpath(name).read_bytes()
+                return gzip.decompress(data) if gzipped else data
+
+            meta = pickle.loads(gzip.decompress(meta) if gzipped else meta)  # nosec
+            rows.append((
+                request_dir.name,
+                meta['response_url'],
+                meta['status'],
+                zlib.compress(read('response_headers')),
+                zlib.compress(read('response_body')),
+                meta['timestamp'],
+            ))
+            if len(rows) >= 500:
+                db.put(rows)
+                rows = []
+        db.put(rows)
+        counts[category_dir.name] = db.db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        db.close()
+    return counts
@@ -0,0 +1,92 @@
+import hashlib
+import os
+from pathlib import Path
+import shutil
+import sqlite3
+
+
+class ImageStore:
+    # icons kept between runs: the bodies by content hash under `objects/`,
+    # the hash and validators of every icon path in `index.sqlite`
+
+    _opened: dict[Path, 'ImageStore'] = {}
+
+    def __init__(self, path: str | Path):
+        self.root = Path(path)
+        self.objects = self.root.joinpath('objects')
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.root.joinpath('index.sqlite'))
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS icons (
+                icon TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                hash TEXT NOT NULL
+            )
+        ''')
+        self.pending = 0
+
+    @classmethod
+    def open(cls, path: str | Path) -> 'ImageStore':
+        path = Path(path).resolve()
+        if path not in cls._opened:
+            cls._opened[path] = cls(path)
+        return cls._opened[path]
+
+    def object_path(self, hash: str) -> Path:
+        return self.objects.joinpath(hash[:2], hash)
+
+    def get(self, icon: str) -> dict | None:
+        row = self.db.execute(
+            'SELECT etag, last_modified, hash FROM icons WHERE icon = ?', (icon,)).fetchone()
+        if row is None or not self.object_path(row[2]).exists():
+            return None
+        etag, last_modified, hash = row
+        return {'etag': etag, 'last_modified': last_modified, 'hash': hash}
+
+    def save(self, icon: str, body: bytes, etag: str | None, last_modified: str | None) -> bool:
+        # whether the icon changed, same bodies are written once
+        hash = hashlib.sha256(body).hexdigest()
+        file_path = self.object_path(hash)
+        if not file_path.exists():
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = file_path.with_suffix('.tmp')
+            tmp_path.write_bytes(body)
+            tmp_path.replace(file_path)
+        state = self.get(icon)
+        self.db.execute('INSERT OR REPLACE INTO icons VALUES (?, ?, ?, ?)',
+                        (icon, etag, last_modified, hash))
+        self.flush()
+        return state is None or state['hash'] != hash
+
+    def flush(self, force: bool = False):
+        self.pending += 1
+        if force or self.pending >= 500:
+            self.db.commit()
+            self.pending = 0
+
+    def materialize(self, icons: list[str], output_dir: Path) -> list[str]:
+        # hardlinks `<output_dir>/<icon>` to the stored bodies, returns the
+        # icons never downloaded
+        self.flush(force=True)
+        missing = []
+        for icon in icons:
+            state = self.get(icon)
+            if state is None:
+                missing.append(icon)
+                continue
+            file_path = output_dir.joinpath(icon.strip('/'))
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.unlink(missing_ok=True)
+            try:
+                os.link(self.object_path(state['hash']), file_path)
+            except OSError:
+                # another filesystem
+                shutil.copyfile(self.object_path(state['hash']), file_path)
+        return missing
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+        self._opened.pop(self.root.resolve(), None)
@@ -0,0 +1,102 @@
+from collections import defaultdict
+import json
+from pathlib import Path
+import sqlite3
+
+
+class EntryStateStore:
+    # url -> validators, body hash and last parsed item of a codex entry,
+    # kept between runs so unchanged entries don't need to be parsed again
+
+    _opened: dict[Path, 'EntryStateStore'] = {}
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                language TEXT NOT NULL,
+                category TEXT NOT NULL,
+                id TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                hash TEXT,
+                item TEXT,
+                run INTEGER NOT NULL,
+                status TEXT NOT NULL
+            )
+        ''')
+        self.run = self.db.execute(
+            'SELECT COALESCE(MAX(run), 0) + 1 FROM entries').fetchone()[0]
+        self.pending = 0
+
+    @classmethod
+    def open(cls, path: str | Path) -> 'EntryStateStore':
+        path = Path(path).resolve()
+        if path not in cls._opened:
+            cls._opened[path] = cls(path)
+        return cls._opened[path]
+
+    def get(self, url: str) -> dict | None:
+        row = self.db.execute(
+            'SELECT etag, last_modified, hash, item FROM entries WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, hash, item = row
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'hash': hash,
+            'item': json.loads(item) if item else None,
+        }
+
+    def save(self, url: str, language: str, category: str, id: str,
+             state: dict, item: dict):
+        self.db.execute('''
+            INSERT OR REPLACE INTO entries
+            (url, language, category, id, etag, last_modified, hash, item, run, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            url, language, category, id,
+            state.get('etag'), state.get('last_modified'), state.get('hash'),
+            json.dumps(item, ensure_ascii=False), self.run, state['status']
+        ))
+        self.flush()
+
+    def touch(self, url: str):
+        self.db.execute(
+            'UPDATE entries SET run = ?, status = ? WHERE url = ?', (self.run, 'unchanged', url))
+        self.flush()
+
+    def flush(self, force: bool = False):
+        self.pending += 1
+        if force or self.pending >= 500:
+            self.db.commit()
+            self.pending = 0
+
+    def report(self, languages: list[str], categories: list[str]) -> dict:
+        # entries of the crawled languages not seen in this run are removed
+        report = {category: defaultdict(set) for category in categories}
+        rows = self.db.execute('SELECT language, category, id, run, status FROM entries')
+        for language, category, id, run, status in rows:
+            if language not in languages or category not in report:
+                continue
+            report[category]['removed' if run != self.run else status].add(id)
+        self.db.execute(
+            f'''DELETE FROM entries WHERE run != ?
+                AND language IN ({','.join('?' * len(languages))})
+                AND category IN ({','.join('?' * len(categories))})''',
+            (self.run, *languages, *categories))
+        self.flush(force=True)
+        return {
+            category: {status: sorted(ids) for status, ids in sorted(statuses.items())}
+            for category, statuses in report.items()
+        }
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+        self._opened.pop(self.path.resolve(), None)
@@ -0,0 +1,66 @@
+from collections.abc import Iterator
+import json
+from pathlib import Path
+
+
+def read_json(file_path: Path):
+    with open(file_path) as f:
+        return json.load(f)
+
+
+class CodexFiles:
+    # the codex and locales listed in the manifest.json of a `codex` output,
+    # as one file each or split per category (`--sharded`)
+
+    def __init__(self, input_dir: str | Path):
+        self.root = Path(input_dir)
+        self.manifest = read_json(self.root.joinpath('manifest.json'))
+        self.files = self.manifest['files']
+
+    @property
+    def sharded(self) -> bool:
+        return isinstance(self.files['codex'], dict)
+
+    @property
+    def languages(self) -> list[str]:
+        return list(self.files['locales'].keys())
+
+    def load_codex(self, categories: list[str] | None = None) -> dict:
+        # only the shards of `categories` are read, the others are left out
+        if not self.sharded:
+            codex = read_json(self.root.joinpath(self.files['codex']))
+            if categories is not None:
+                codex['entries'] = [e for e in codex['entries'] if e['category'] in categories]
+            return codex
+        shards = self.files['codex']
+        return {
+            'entries': [
+                entry for category, file_name in shards['entries'].items()
+                if categories is None or category in categories
+                for entry in read_json(self.root.joinpath(file_name))
+            ],
+            'meta': read_json(self.root.joinpath(shards['meta'])),
+        }
+
+    def load_locale(self, language: str, categories: list[str] | None = None) -> dict:
+        locales_dir = self.root.joinpath('locales')
+        if not self.sharded:
+            locale = read_json(locales_dir.joinpath(self.files['locales'][language]))
+            if categories is not None:
+                locale['entries'] = [e for e in locale['entries'] if e['category'] in categories]
+            return locale
+        shards = self.files['locales'][language]
+        meta = read_json(locales_dir.joinpath(shards['meta']))
+        return {
+            'msg': meta['msg'],
+            'entries': [
+                entry for category, file_name in shards['entries'].items()
+                if categories is None or category in categories
+                for entry in read_json(locales_dir.joinpath(file_name))
+            ],
+            'abilities': meta['abilities'],
+        }
+
+    def locales(self, categories: list[str] | None = None) -> Iterator[tuple[str, dict]]:
+        for language in self.languages:
+            yield language, self.load_locale(language, categories)
@@ -0,0 +1,112 @@
+from bisect import bisect_left
+from collections import defaultdict
+import re
+import unicodedata
+
+from . import delta_decode, delta_encode
+
+
+# search index of a locale (`locales/search/<language>.<hash>.json`):
+#   tokens:    the tokens in order, so a prefix is a range of them
+#   entries:   for each token the codex entry numbers (delta encoded)
+#   abilities: for each token the numbers of `ability_ids` (delta encoded)
+#
+# names and descriptions are normalized (NFKC, casefold) and cut into words,
+# runs of CJK characters into each character and each pair of characters
+
+# kana, CJK ideographs (with extension A and compatibility) and hangul
+CJK = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af'
+token_re = re.compile(rf'[{CJK}]+|[^\W{CJK}]+')
+cjk_re = re.compile(rf'[{CJK}]')
+
+searched_fields = ('name', 'description')
+
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize('NFKC', text).casefold()
+
+
+def iter_words(text: str):
+    return token_re.findall(normalize(text))
+
+
+def tokenize(text: str) -> set[str]:
+    tokens = set()
+    for word in iter_words(text):
+        if cjk_re.match(word):
+            tokens.update(word)
+            tokens.update(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.add(word)
+    return tokens
+
+
+def build_search_index(locale: dict, entry_numbers: dict[str, int]) -> dict:
+    # `entry_numbers`: `category/id` -> position in the codex entries
+    entries = defaultdict(set)
+    abilities = defaultdict(set)
+    for entry in locale['entries']:
+        n = entry_numbers.get(f"{entry['category']}/{entry['id']}")
+        if n is None:
+            continue
+        for field in searched_fields:
+            if isinstance(entry.get(field), str):
+                for token in tokenize(entry[field]):
+                    entries[token].add(n)
+    ability_ids = []
+    for n, ability in enumerate(locale['abilities']):
+        ability_ids.append(ability['id'])
+        for field in searched_fields:
+            if isinstance(ability.get(field), str):
+                for token in tokenize(ability[field]):
+                    abilities[token].add(n)
+    tokens = sorted(entries.keys() | abilities.keys())
+    return {
+        'ability_ids': ability_ids,
+        'tokens': tokens,
+        'entries': [delta_encode(sorted(entries.get(token, ()))) for token in tokens],
+        'abilities': [delta_encode(sorted(abilities.get(token, ()))) for token in tokens],
+    }
+
+
+class SearchIndex:
+    # lookups as a client does them: every word of the query must match,
+    # the last one as a prefix; CJK words match by their pairs of characters,
+    # so the hits may need a substring check
+
+    def __init__(self, data: dict):
+        self.ability_ids = data['ability_ids']
+        self.tokens = data['tokens']
+        self.entries = data['entries']
+        self.abilities = data['abilities']
+        self.index = {token: i for i, token in enumerate(self.tokens)}
+
+    def token_range(self, prefix: str) -> range:
+        start = bisect_left(self.tokens, prefix)
+        end = start
+        while end < len(self.tokens) and self.tokens[end].startswith(prefix):
+            end += 1
+        return range(start, end)
+
+    def matches(self, word: str, prefix: bool) -> list[list[int]]:
+        # token indexes that must all match, each as alternatives
+        if cjk_re.match(word):
+            pairs = [word[i:i + 2] for i in range(len(word) - 1)] or [word]
+            return [[self.index[pair]] if pair in self.index else [] for pair in pairs]
+        if prefix:
+            return [list(self.token_range(word))]
+        return [[self.index[word]] if word in self.index else []]
+
+    def search(self, query: str) -> tuple[list[int], list[str]]:
+        # (entry numbers, ability ids)
+        words = iter_words(query)
+        if not any(words):
+            return [], []
+        entries, abilities = None, None
+        for i, word in enumerate(words):
+            for alternatives in self.matches(word, prefix=i == len(words) - 1):
+                found_entries = {n for t in alternatives for n in delta_decode(self.entries[t])}
+                found_abilities = {n for t in alternatives for n in delta_decode(self.abilities[t])}
+                entries = found_entries if entries is None else entries & found_entries
+                abilities = found_abilities if abilities is None else abilities & found_abilities
+        return sorted(entries), [self.ability_ids[n] for n in sorted(abilities)]
@@ -0,0 +1,133 @@
+from lxml import etree
+from scrapy.http.response import Response
+
+
+def compile_xpath(expr: str) -> etree.XPath:
+    # compiled once and shared, results are plain str like parsel's
+    return etree.XPath(expr, smart_strings=False)
+
+
+string = compile_xpath('string()')
+text_nodes = compile_xpath('./text()')
+children = compile_xpath('./*')
+
+# drops
+codex_pages = compile_xpath("//div[@class='codex-page'][1]")
+bond = compile_xpath('./span[@class="emph"]')
+parent_text_nodes = compile_xpath('../text()')
+spaced = compile_xpath('./self::div[@class="spaced"]')
+spans = compile_xpath('.//span')
+emph = compile_xpath('./div[@class="emph"]')
+codex_stats = compile_xpath('.//div[@class="codex-stats"]')
+codex_stat = compile_xpath('./div[@class="codex-stat"]')
+img_src = compile_xpath('.//img/@src')
+a_href = compile_xpath('.//a/@href')
+
+# followers
+dt_text_nodes = compile_xpath('./dt/text()')
+dd_text_nodes = compile_xpath('./dd/text()')
+
+# items
+exotic = compile_xpath("./span[@class='exotic']")
+item_ability = compile_xpath(
+    "//div[@class='codex-page-description']/preceding-sibling::div[1] | //div[@class='codex-page-description']")
+
+
+def get(xpath: etree.XPath, elements: list):
+    # SelectorList.xpath(...).get()
+    for element in elements:
+        for result in xpath(element):
+            return result
+    return None
+
+
+def getall(xpath: etree.XPath, elements: list) -> list:
+    return [result for element in elements for result in xpath(element)]
+
+
+def texts(elements: list) -> list[str]:
+    # SelectorList.xpath('string()').getall()
+    return [string(element) for element in elements]
+
+
+def has_child_elements(element) -> bool:
+    return any(True for _ in element.iterchildren('*'))
+
+
+class CodexPage:
+    # the regions of a codex detail page the spiders read, found in one
+    # walk over the document instead of one `//...` query each
+
+    def __init__(self, response: Response):
+        self.root = response.selector.root
+        self.h1 = []
+        # <img> in the page icon
+        self.icons = []
+        # (class, element) of every <div> with a class, in document order
+        self.divs = []
+        self.pre_descriptions = []
+        self.stat_lists = []
+        for element in self.root.iter('*'):
+            tag = element.tag
+            if tag == 'div':
+                cls = element.get('class')
+                if cls is not None:
+                    self.divs.append((cls, element))
+            elif tag == 'img':
+                parent = element.getparent()
+                if parent.tag == 'div' and parent.get('class') == 'codex-page-icon':
+                    self.icons.append(element)
+            elif tag == 'h1':
+                self.h1.append(element)
+            elif tag == 'pre' and element.get('class') == 'codex-page-description':
+                self.pre_descriptions.append(element)
+            elif tag == 'dl' and element.get('class') == 'stats':
+                self.stat_lists.append(element)
+
+    def find(self, *classes: str) -> list:
+        return [element for cls, element in self.divs if cls in classes]
+
+    def text(self, *classes: str) -> str | None:
+        # `//div[@class=...]` `.xpath('string()').get()`
+        found = self.find(*classes)
+        return string(found[0]) if found else None
+
+    def texts(self, *classes: str) -> list[str]:
+        return texts(self.find(*classes))
+
+    @property
+    def name(self) -> str:
+        return string(self.h1[0]).strip()
+
+    @property
+    def icon(self) -> str | None:
+        return next((img.get('src') for img in self.icons if img.get('src') is not None), None)
+
+    @property
+    def aura(self) -> str | None:
+        return next((img.get('class') for img in self.icons if img.get('class') is not None), None)
+
+    @property
+    def events(self) -> list[str]:
+        return self.texts('codex-page-description codex-page-description-highlight')
+
+    @property
+    def tags(self) -> list[str]:
+        return self.texts('codex-page-tag')
+
+    @property
+    def stats(self) -> list:
+        # //div[@class='codex-stats']/div[contains(@class,'codex-stat')]
+        return [child for stats in self.find('codex-stats') for child in stats.iterchildren('div')
+                if 'codex-stat' in child.get('class', '')]
+
+    def descriptions(self, with_drop: bool) -> list:
+        # codex-page-description divs that do / don't hold a `drop`
+        return [element for element in self.find('codex-page-description')
+                if with_drop == any(e.get('class') == 'drop' for e in element.iterdescendants('*'))]
+
+    def meta_and_descriptions(self) -> list:
+        # //div[@class='codex-page-meta'] | //div[@class='codex-page-description' and not(descendant::*[@class='drop'])]
+        without_drop = set(self.descriptions(with_drop=False))
+        return [element for cls, element in self.divs
+                if cls == 'codex-page-meta' or element in without_drop]